@@ -0,0 +1,47 @@
+"""add call_metrics_daily rollup
+
+Revision ID: 3f9c2a7d1e84
+Revises: b7e31265de1f
+Create Date: 2026-10-19 10:12:41.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d1e84'
+down_revision: Union[str, Sequence[str], None] = 'b7e31265de1f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('call_metrics_daily',
+    sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+    sa.Column('campaign_id', sa.Text(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('market', sa.Text(), nullable=True),
+    sa.Column('plancode', sa.Text(), nullable=True),
+    sa.Column('score', sa.Text(), nullable=True),
+    sa.Column('calls', sa.BigInteger(), nullable=False),
+    sa.Column('answered', sa.BigInteger(), nullable=False),
+    sa.Column('voicemails', sa.BigInteger(), nullable=False),
+    sa.Column('callbacks', sa.BigInteger(), nullable=False),
+    sa.Column('frustrated', sa.BigInteger(), nullable=False),
+    sa.Column('hallucinations', sa.BigInteger(), nullable=False),
+    sa.Column('duration_total', sa.BigInteger(), nullable=False),
+    sa.Column('duration_calls', sa.BigInteger(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_call_metrics_daily_campaign_day', 'call_metrics_daily', ['campaign_id', 'day'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_call_metrics_daily_campaign_day', table_name='call_metrics_daily')
+    op.drop_table('call_metrics_daily')
@@ -0,0 +1,37 @@
+"""unique call_metrics_daily buckets
+
+Revision ID: 8c5d2e91f4a7
+Revises: e4a1c7d93b25
+Create Date: 2026-10-19 18:02:14.936120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c5d2e91f4a7'
+down_revision: Union[str, Sequence[str], None] = 'e4a1c7d93b25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Concurrent refreshes may have rolled up a bucket twice; each copy holds the full counts, keep one.
+    op.execute(
+        "DELETE FROM call_metrics_daily a USING call_metrics_daily b "
+        "WHERE a.id < b.id AND a.campaign_id = b.campaign_id AND a.day = b.day "
+        "AND a.market IS NOT DISTINCT FROM b.market AND a.plancode IS NOT DISTINCT FROM b.plancode "
+        "AND a.score IS NOT DISTINCT FROM b.score"
+    )
+    op.drop_index('ix_call_metrics_daily_campaign_day', table_name='call_metrics_daily')
+    op.create_unique_constraint('uq_call_metrics_daily_bucket', 'call_metrics_daily', ['campaign_id', 'day', 'market', 'plancode', 'score'], postgresql_nulls_not_distinct=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_call_metrics_daily_bucket', 'call_metrics_daily', type_='unique')
+    op.create_index('ix_call_metrics_daily_campaign_day', 'call_metrics_daily', ['campaign_id', 'day'], unique=False)
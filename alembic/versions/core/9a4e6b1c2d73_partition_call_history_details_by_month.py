@@ -0,0 +1,161 @@
+"""partition call_history_details by month
+
+The legacy table is renamed and every row is copied into the new partitions
+in a single INSERT ... SELECT, inside the migration transaction. Both tables
+stay under an ACCESS EXCLUSIVE lock until the commit, so every read and write
+of call_history_details blocks for the whole copy, and the copy needs room for
+a second full copy of the table (plus WAL) until the legacy table is dropped.
+Run it in a maintenance window with the writers stopped, sized to the table.
+
+Rows without processed_at, which is now part of the primary key, are copied
+with an 'epoch' sentinel and land in the default partition; the downgrade
+turns the sentinel back into NULL.
+
+Revision ID: 9a4e6b1c2d73
+Revises: 3f9c2a7d1e84
+Create Date: 2026-10-19 11:02:17.904412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4e6b1c2d73'
+down_revision: Union[str, Sequence[str], None] = '3f9c2a7d1e84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = (
+    "insight_id, campaign_id, room_id, opportunity_id, thread_id, user_name, user_phone, user_email, "
+    "plancode, market, answer, voicemail_answer, availability, recording_consent, motivation, work_status, "
+    "financial_interest, financial_topics, financial_details, objection, score, summary, callback_requested, "
+    "callback_reference_day, callback_at, quality_notes, user_satisfaction, frustration, hallucination_detected, "
+    "compliance_risk_detected, duration_seconds, recording_url"
+)
+
+
+def _columns() -> list[sa.Column]:
+    return [
+        sa.Column('insight_id', sa.UUID(), nullable=False),
+        sa.Column('campaign_id', sa.Text(), nullable=True),
+        sa.Column('room_id', sa.Text(), nullable=True),
+        sa.Column('opportunity_id', sa.Text(), nullable=True),
+        sa.Column('thread_id', sa.UUID(), nullable=True),
+        sa.Column('user_name', sa.Text(), nullable=True),
+        sa.Column('user_phone', sa.Text(), nullable=True),
+        sa.Column('user_email', sa.Text(), nullable=True),
+        sa.Column('plancode', sa.Text(), nullable=True),
+        sa.Column('market', sa.Text(), nullable=True),
+        sa.Column('answer', sa.Boolean(), nullable=True),
+        sa.Column('voicemail_answer', sa.Boolean(), nullable=True),
+        sa.Column('availability', sa.Text(), nullable=True),
+        sa.Column('recording_consent', sa.Boolean(), nullable=True),
+        sa.Column('motivation', sa.Text(), nullable=True),
+        sa.Column('work_status', sa.Text(), nullable=True),
+        sa.Column('financial_interest', sa.Boolean(), nullable=True),
+        sa.Column('financial_topics', sa.ARRAY(sa.Text()), nullable=True),
+        sa.Column('financial_details', sa.Text(), nullable=True),
+        sa.Column('objection', sa.Text(), nullable=True),
+        sa.Column('score', sa.Text(), nullable=True),
+        sa.Column('summary', sa.Text(), nullable=True),
+        sa.Column('callback_requested', sa.Boolean(), nullable=True),
+        sa.Column('callback_reference_day', sa.Text(), nullable=True),
+        sa.Column('callback_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('quality_notes', sa.Text(), nullable=True),
+        sa.Column('user_satisfaction', sa.Text(), nullable=True),
+        sa.Column('frustration', sa.Boolean(), nullable=True),
+        sa.Column('hallucination_detected', sa.Boolean(), nullable=True),
+        sa.Column('compliance_risk_detected', sa.Boolean(), nullable=True),
+        sa.Column('duration_seconds', sa.Integer(), nullable=True),
+        sa.Column('recording_url', sa.Text(), nullable=True),
+    ]
+
+
+def _create_indexes() -> None:
+    op.create_index('ix_call_history_campaign_id', 'call_history_details', ['campaign_id'], unique=False)
+    op.create_index('ix_call_history_details_campaign_processed', 'call_history_details', ['campaign_id', sa.literal_column('processed_at DESC')], unique=False)
+    op.create_index('ix_call_history_details_opportunity_processed', 'call_history_details', ['opportunity_id', sa.literal_column('processed_at DESC')], unique=False)
+    op.create_index('ix_call_history_details_room_id', 'call_history_details', ['room_id'], unique=False, postgresql_where=sa.text('room_id IS NOT NULL'))
+
+
+def _drop_indexes() -> None:
+    op.drop_index('ix_call_history_details_room_id', table_name='call_history_details', postgresql_where=sa.text('room_id IS NOT NULL'))
+    op.drop_index('ix_call_history_details_opportunity_processed', table_name='call_history_details')
+    op.drop_index('ix_call_history_details_campaign_processed', table_name='call_history_details')
+    op.drop_index('ix_call_history_campaign_id', table_name='call_history_details')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Partition bounds are computed as UTC month starts, matching
+    # AnalyticsTable.ensure_partitions.
+    op.execute("SET LOCAL TIME ZONE 'UTC'")
+
+    _drop_indexes()
+    op.rename_table('call_history_details', 'call_history_details_legacy')
+    op.execute('ALTER TABLE call_history_details_legacy DROP CONSTRAINT call_history_details_pkey')
+
+    op.create_table('call_history_details',
+    *_columns(),
+    sa.Column('processed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('insight_id', 'processed_at'),
+    postgresql_partition_by='RANGE (processed_at)'
+    )
+    _create_indexes()
+    op.execute('CREATE TABLE call_history_details_default PARTITION OF call_history_details DEFAULT')
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            month timestamptz;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    date_trunc('month', coalesce((SELECT min(processed_at) FROM call_history_details_legacy), now())),
+                    date_trunc('month', now()) + interval '2 months',
+                    interval '1 month'
+                )
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF call_history_details FOR VALUES FROM (%L) TO (%L)',
+                    'call_history_details_p' || to_char(month, 'YYYYMM'),
+                    month,
+                    month + interval '1 month'
+                );
+            END LOOP;
+        END $$
+        """
+    )
+    # processed_at is now part of the key; the few legacy rows without one
+    # keep an explicit epoch sentinel and land in the default partition.
+    op.execute(
+        f"INSERT INTO call_history_details ({COLUMNS}, processed_at) "
+        f"SELECT {COLUMNS}, coalesce(processed_at, 'epoch') FROM call_history_details_legacy"
+    )
+    op.drop_table('call_history_details_legacy')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.rename_table('call_history_details', 'call_history_details_partitioned')
+    op.execute('ALTER TABLE call_history_details_partitioned DROP CONSTRAINT call_history_details_pkey')
+    op.execute('ALTER INDEX ix_call_history_campaign_id RENAME TO ix_call_history_campaign_id_partitioned')
+    op.execute('ALTER INDEX ix_call_history_details_campaign_processed RENAME TO ix_call_history_details_campaign_processed_partitioned')
+    op.execute('ALTER INDEX ix_call_history_details_opportunity_processed RENAME TO ix_call_history_details_opportunity_processed_partitioned')
+    op.execute('ALTER INDEX ix_call_history_details_room_id RENAME TO ix_call_history_details_room_id_partitioned')
+
+    op.create_table('call_history_details',
+    *_columns(),
+    sa.Column('processed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('insight_id')
+    )
+    _create_indexes()
+    op.execute(
+        f"INSERT INTO call_history_details ({COLUMNS}, processed_at) "
+        f"SELECT {COLUMNS}, nullif(processed_at, 'epoch') FROM call_history_details_partitioned"
+    )
+    op.drop_table('call_history_details_partitioned')
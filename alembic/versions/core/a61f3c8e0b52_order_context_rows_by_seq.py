@@ -0,0 +1,32 @@
+"""order context rows by seq
+
+Revision ID: a61f3c8e0b52
+Revises: 8c5d2e91f4a7
+Create Date: 2026-10-19 18:40:52.117384
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a61f3c8e0b52'
+down_revision: Union[str, Sequence[str], None] = '8c5d2e91f4a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('context', sa.Column('seq', sa.BigInteger(), sa.Identity(always=False), nullable=False))
+    op.drop_index('ix_context_opportunity_added', table_name='context', postgresql_include=['type', 'channel'])
+    op.create_index('ix_context_opportunity_added', 'context', ['opportunity_id', sa.literal_column('added_timestamp DESC'), sa.literal_column('seq DESC')], unique=False, postgresql_include=['type', 'channel'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_context_opportunity_added', table_name='context', postgresql_include=['type', 'channel'])
+    op.create_index('ix_context_opportunity_added', 'context', ['opportunity_id', sa.literal_column('added_timestamp DESC')], unique=False, postgresql_include=['type', 'channel'])
+    op.drop_column('context', 'seq')
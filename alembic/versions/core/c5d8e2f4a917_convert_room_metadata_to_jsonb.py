@@ -0,0 +1,36 @@
+"""convert room metadata to jsonb
+
+Revision ID: c5d8e2f4a917
+Revises: 9a4e6b1c2d73
+Create Date: 2026-10-19 12:21:05.337190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d8e2f4a917'
+down_revision: Union[str, Sequence[str], None] = '9a4e6b1c2d73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('rooms', 'metadata',
+               existing_type=postgresql.JSON(astext_type=sa.Text()),
+               type_=postgresql.JSONB(astext_type=sa.Text()),
+               existing_nullable=True,
+               postgresql_using='metadata::jsonb')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('rooms', 'metadata',
+               existing_type=postgresql.JSONB(astext_type=sa.Text()),
+               type_=postgresql.JSON(astext_type=sa.Text()),
+               existing_nullable=True,
+               postgresql_using='metadata::json')
@@ -0,0 +1,28 @@
+"""add schedule_calls dispatch index
+
+Revision ID: d2b7f0c81e56
+Revises: c5d8e2f4a917
+Create Date: 2026-10-19 13:04:52.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2b7f0c81e56'
+down_revision: Union[str, Sequence[str], None] = 'c5d8e2f4a917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_schedule_calls_dispatch', 'schedule_calls', ['scheduled_at'], unique=False, postgresql_where=sa.text("status IN ('pending', 'dispatching')"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_schedule_calls_dispatch', table_name='schedule_calls', postgresql_where=sa.text("status IN ('pending', 'dispatching')"))
@@ -0,0 +1,40 @@
+"""store context content as jsonb
+
+Revision ID: e4a1c7d93b25
+Revises: d2b7f0c81e56
+Create Date: 2026-10-19 14:21:36.507219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a1c7d93b25'
+down_revision: Union[str, Sequence[str], None] = 'd2b7f0c81e56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Content used to be a json.dumps string stored in a JSON column; unwrap it.
+    op.alter_column('context', 'content',
+               existing_type=sa.JSON(),
+               type_=postgresql.JSONB(),
+               existing_nullable=True,
+               postgresql_using="CASE WHEN json_typeof(content) = 'string' THEN (content #>> '{}')::jsonb ELSE content::jsonb END")
+    op.create_index('ix_context_opportunity_added', 'context', ['opportunity_id', sa.literal_column('added_timestamp DESC')], unique=False, postgresql_include=['type', 'channel'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_context_opportunity_added', table_name='context', postgresql_include=['type', 'channel'])
+    op.alter_column('context', 'content',
+               existing_type=postgresql.JSONB(),
+               type_=sa.JSON(),
+               existing_nullable=True,
+               postgresql_using='to_json(content::text)')
@@ -0,0 +1,33 @@
+import argparse
+import json
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, cast
+
+from echo.context.chain import format_input
+from echo.utils.messages import livekit_report_to_chat, livekit_report_to_messages
+
+REPORT_PATH = Path(__file__).parent / ".." / "data" / "session-report.json"
+
+
+def bench(name: str, fn: Callable[[], Any], number: int) -> None:
+    seconds = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    print(f"{name:<28} {seconds * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the session report conversions on a large report.")
+    parser.add_argument("--scale", type=int, default=100, help="times the sample report's events are repeated")
+    parser.add_argument("--number", type=int, default=20, help="calls per timing")
+    args = parser.parse_args()
+
+    with open(REPORT_PATH) as f:
+        sample = cast(dict[str, Any], json.load(f))
+    report = {**sample, "events": sample.get("events", []) * args.scale}
+    chat = livekit_report_to_chat(report)
+    print(f"{len(report['events'])} events, {len(chat)} messages")
+
+    bench("livekit_report_to_chat", lambda: livekit_report_to_chat(report), args.number)
+    bench("livekit_report_to_messages", lambda: livekit_report_to_messages(report), args.number)
+    bench("format_input", lambda: format_input({"chat": chat}), args.number)
@@ -1,6 +1,5 @@
 import asyncio
 import re
-import uuid
 from pathlib import Path
 from typing import cast
 
@@ -16,21 +15,6 @@ EMAIL_REGEX = re.compile(r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$")
 NON_PHONE_CHARS = re.compile(r"[^\d+]")
 
 
-def clean_email(value: str | None) -> str | None:
-    if value is None:
-        return None
-
-    value = str(value).strip()
-
-    if value == "" or value.lower() == "<null>":
-        return None
-
-    if not EMAIL_REGEX.match(value):
-        return None
-
-    return value.lower()
-
-
 def clean_phone(value: str | None, mobile_only: bool = True) -> str | None:
     import phonenumbers
     from phonenumbers.phonenumberutil import (
@@ -83,41 +67,57 @@ def clean_phone(value: str | None, mobile_only: bool = True) -> str | None:
     return cast(str | None, phone_number)
 
 
-def get_trimmed(row: pd.Series, key: str) -> str | None:
-    value = row.get(key)
+def trimmed(series: pd.Series) -> pd.Series:
+    values = series.astype("string").str.strip()
+    return values.mask((values == "") | (values.str.lower() == "<null>"))
 
-    if value is None:
-        return None
 
-    value = str(value).strip()
+def clean_emails(series: pd.Series) -> pd.Series:
+    values = trimmed(series)
+    return values.where(values.str.fullmatch(EMAIL_REGEX.pattern)).str.lower()
 
-    if value == "" or value.lower() == "<null>":
-        return None
 
-    return cast(str | None, value)
+def clean_phones(series: pd.Series, mobile_only: bool = True) -> pd.Series:
+    values = trimmed(series).str.replace(NON_PHONE_CHARS, "", regex=True)
+    values = values.str.replace(r"^00", "+", regex=True)
+    values = values.mask(~values.str.startswith("+") & values.str.isdigit(), "+" + values)
+    values = values.where(values.str.startswith("+"))
+
+    # Number validation can't be vectorized, so parse each distinct number once.
+    unique = values.dropna().unique()
+    parsed = {value: clean_phone(value, mobile_only=mobile_only) for value in unique}
+    return values.map(parsed)
+
+
+def to_records(df: pd.DataFrame) -> list[dict[str, str | None]]:
+    users = pd.DataFrame(
+        {
+            "contact_id": trimmed(df["CONTACTID"]),
+            "opportunity_id": trimmed(df["OPPORTUNITYID"]),
+            "name": trimmed(df["FIRSTNAME"]),
+            "last_name": trimmed(df["LASTNAME"]),
+            "phone_number": clean_phones(df["mobile"]),
+            "mail": clean_emails(df["EMAIL"]),
+            "market": trimmed(df["MERCADO"]),
+            "faculty": trimmed(df["FACULTAD"]),
+            "plancode": trimmed(df["PLANCODE"]),
+            "track": trimmed(df["track"]),
+        }
+    )
+    users = users.astype(object).where(users.notna(), None)
+    return cast(list[dict[str, str | None]], users.to_dict("records"))
 
 
 async def main() -> None:
     excel_path = Path(__file__).parent / ".." / "user_data.xlsx"
-    df = pd.read_excel(excel_path)
+    df = pd.read_excel(excel_path, dtype=str)
+
+    records = to_records(df)
 
     async with PostgresStore.open() as store:
-        for _, row in df.iterrows():
-            user_id = uuid.uuid4()
-
-            await store.users.upsert_user(
-                user_id=user_id,
-                contact_id=get_trimmed(row, "CONTACTID"),
-                opportunity_id=get_trimmed(row, "OPPORTUNITYID"),
-                name=get_trimmed(row, "FIRSTNAME"),
-                last_name=get_trimmed(row, "LASTNAME"),
-                phone_number=clean_phone(get_trimmed(row, "mobile")),
-                mail=clean_email(get_trimmed(row, "EMAIL")),
-                market=get_trimmed(row, "MERCADO"),
-                faculty=get_trimmed(row, "FACULTAD"),
-                plancode=get_trimmed(row, "PLANCODE"),
-                track=get_trimmed(row, "track"),
-            )
+        count = await store.users.bulk_upsert_users(records)
+
+    print(f"Upserted {count} users")
 
 
 if __name__ == "__main__":
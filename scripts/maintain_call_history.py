@@ -0,0 +1,46 @@
+import argparse
+import asyncio
+import logging
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from echo.store.store import PostgresStore
+
+ENV_FILE = Path(__file__).parent / ".." / ".env"
+load_dotenv(ENV_FILE)
+
+log = logging.getLogger(__name__)
+
+
+async def maintain(months_ahead: int, retain_days: int | None, drop: bool) -> None:
+    async with PostgresStore.open() as store:
+        created = await store.analytics.ensure_partitions(months_ahead=months_ahead)
+        log.info("Created partitions: %s", ", ".join(created) or "none")
+
+        if retain_days is not None:
+            before = datetime.now(UTC) - timedelta(days=retain_days)
+            detached = await store.analytics.detach_partitions(before, drop=drop)
+            log.info("%s partitions: %s", "Dropped" if drop else "Detached", ", ".join(detached) or "none")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Create and retire monthly call_history_details partitions")
+    parser.add_argument("--months-ahead", type=int, default=2, help="Future months to pre-create (default: 2)")
+    parser.add_argument(
+        "--retain-days",
+        type=int,
+        default=None,
+        help="Detach partitions whose month ended more than this many days ago (default: keep everything)",
+    )
+    parser.add_argument("--drop", action="store_true", help="Drop detached partitions instead of keeping them")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-8s %(message)s")
+
+    asyncio.run(maintain(args.months_ahead, args.retain_days, args.drop))
+
+
+if __name__ == "__main__":
+    main()
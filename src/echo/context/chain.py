@@ -6,10 +6,12 @@ from langchain_core.runnables import RunnableSerializable
 
 from echo.context.types import Chat
 from echo.prompts import load_prompt_by_name
-from echo.utils.model import build_model
+from echo.utils.model import build_model, cache_per_loop
 
 
+@cache_per_loop
 def build_chain() -> RunnableSerializable[dict[str, Chat], str]:
+    """Summarization chain, built once per event loop along with its model client."""
     sys_prompt_msg = load_prompt_by_name("summarize")
     sys_prompt_tpl = SystemMessagePromptTemplate.from_template(sys_prompt_msg)
     human_prompt_tpl = HumanMessagePromptTemplate.from_template("{content}")
@@ -23,16 +25,47 @@ def build_chain() -> RunnableSerializable[dict[str, Chat], str]:
     return format_input | prompt | model | StrOutputParser()
 
 
-def format_input(input: dict[str, Chat]) -> dict[str, Any]:
-    chat = input["chat"]
-    text = ""
-    for message in chat:
-        if not message["content"]:
-            continue
+@cache_per_loop
+def build_update_chain() -> RunnableSerializable[dict[str, Any], str]:
+    """Chain folding a new part of a conversation (`chat`) into a previous `summary`."""
+    sys_prompt_tpl = SystemMessagePromptTemplate.from_template(load_prompt_by_name("summarize_update"))
+    human_prompt_tpl = HumanMessagePromptTemplate.from_template(
+        "Resumen previo:\n{summary}\n\nNueva parte de la conversación:\n{content}"
+    )
+    model = build_model()
+
+    prompt = ChatPromptTemplate(
+        [sys_prompt_tpl, human_prompt_tpl],
+        input_variables=["summary", "content"],
+    )
+
+    return format_input | prompt | model | StrOutputParser()
 
-        text += f"{message['role']}: {message['content']}\n"
+
+@cache_per_loop
+def build_merge_chain() -> RunnableSerializable[dict[str, list[str]], str]:
+    """Chain combining the partial `summaries` of consecutive chunks of a conversation into one."""
+    sys_prompt_tpl = SystemMessagePromptTemplate.from_template(load_prompt_by_name("summarize_merge"))
+    human_prompt_tpl = HumanMessagePromptTemplate.from_template("{content}")
+    model = build_model()
+
+    prompt = ChatPromptTemplate(
+        [sys_prompt_tpl, human_prompt_tpl],
+        input_variables=["content"],
+    )
+
+    return format_summaries | prompt | model | StrOutputParser()
+
+
+def format_input(input: dict[str, Chat]) -> dict[str, Any]:
+    text = "".join(f"{message['role']}: {message['content']}\n" for message in input["chat"] if message["content"])
 
     return {
         "content": text,
         **input,
     }
+
+
+def format_summaries(input: dict[str, list[str]]) -> dict[str, Any]:
+    parts = [f"Resumen parcial {i}:\n{summary}" for i, summary in enumerate(input["summaries"], start=1)]
+    return {"content": "\n\n".join(parts)}
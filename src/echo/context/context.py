@@ -1,32 +1,48 @@
-import json
-from datetime import timedelta
+from datetime import datetime, timedelta
 from types import TracebackType
-from typing import Self
+from typing import Any, Self, cast
 from uuid import UUID, uuid4
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from echo.context.types import BlobUrl, Channel, Chat, ContextType
 from echo.db.base import get_sessionmaker
-from echo.db.models.context import Context
+from echo.db.models.context import Context, JsonType
 from echo.db.models.user import User
+from echo.store.context import NewContext
 from echo.store.store import PostgresStore
 
+CONTEXT_HISTORY_LIMIT = 100
+
 
 class UserContext:
+    """A user's context, read and written inside an `async with` block.
+
+    With `buffered=True`, `add_*` calls are kept in memory and written with one
+    multi-row insert when the block exits successfully (or on `flush`), and are
+    discarded if it raises. With `coalesce_chats=True` as well, consecutive
+    chats on the same channel are merged into a single row.
+    """
+
     def __init__(
         self,
         opportunity_id: str,
         channel: Channel,
         thread_id: UUID | None = None,
+        *,
+        buffered: bool = False,
+        coalesce_chats: bool = False,
     ) -> None:
         self.opportunity_id = opportunity_id
         self.channel: Channel = channel
         self.thread_id = thread_id or uuid4()
+        self.buffered = buffered
+        self.coalesce_chats = coalesce_chats
 
         self._session: AsyncSession | None = None
         self._store: PostgresStore | None = None
         self._user: User | None = None
+        self._pending: list[NewContext] = []
 
     @property
     def store(self) -> PostgresStore:
@@ -49,7 +65,7 @@ class UserContext:
 
         self._store = PostgresStore(self._session)
 
-        self._user = await self._store.users.get_user(opportunity_id=self.opportunity_id)
+        self._user = await self._store.users.get_user_cached(self.opportunity_id)
 
         if self._user is None:
             raise RuntimeError("User not found")
@@ -68,6 +84,7 @@ class UserContext:
 
         try:
             if exc_type is None:
+                await self.flush()
                 await session.commit()
             else:
                 await session.rollback()
@@ -76,6 +93,12 @@ class UserContext:
             self._session = None
             self._store = None
             self._user = None
+            self._pending = []
+
+    async def flush(self) -> None:
+        """Write buffered context entries to the session; a no-op when nothing is pending."""
+        pending, self._pending = self._pending, []
+        await self.store.context.create_contexts(pending)
 
     async def get_context(
         self,
@@ -83,43 +106,94 @@ class UserContext:
         max_age: timedelta = timedelta(days=30),
         types: list[ContextType] | None = None,
         channels: list[Channel] | None = None,
+        limit: int | None = CONTEXT_HISTORY_LIMIT,
     ) -> list[Context]:
+        """Return the user's most recent contexts, newest first."""
         return await self.store.context.get_context_history(
             opportunity_id=self.user.opportunity_id,
             max_age=max_age,
             types=types,
             channels=channels,
+            limit=limit,
         )
 
-    async def add_blob(self, blob: BlobUrl) -> None:
-        await self.store.context.create_context(
-            thread_id=self.thread_id,
-            opportunity_id=self.user.opportunity_id,
-            user_id=self.user.user_id,
-            channel=self.channel,
-            type="blob",
-            content=json.dumps(blob),
+    async def update_summary(self, *, max_age: timedelta = timedelta(days=30)) -> str | None:
+        """Fold the chats added since the user's latest summary into a new summary and store it.
+
+        Only the new chats and the previous summary go to the model (see
+        `echo.utils.messages.update_summary`). Pending entries are written
+        first. Each summary records the position of the newest chat folded into
+        it, and the next update starts right after that chat. Returns the latest
+        summary, unchanged when there is nothing new, or None if there is none.
+        """
+        from echo.utils.messages import aupdate_summary
+
+        await self.flush()
+        await self.store.session.flush()
+        opportunity_id = self.user.opportunity_id
+        latest = await self.store.context.get_context_history(
+            opportunity_id=opportunity_id, max_age=max_age, types=["summary"], limit=1
+        )
+        previous = cast(dict[str, Any], latest[0].content) if latest else None
+        new_chats = await self.store.context.get_context_history(
+            opportunity_id=opportunity_id,
+            max_age=max_age,
+            types=["chat"],
+            after=_summary_cursor(latest[0]) if latest else None,
         )
+        chat = [message for context in reversed(new_chats) for message in cast(Chat, context.content)]
+        if not chat:
+            return previous["summary"] if previous else None
+
+        summary = await aupdate_summary(previous["summary"] if previous else None, chat)
+        newest = new_chats[0]
+        await self._add(
+            "summary",
+            {"summary": summary, "until": {"added_timestamp": newest.added_timestamp.isoformat(), "seq": newest.seq}},
+        )
+        return summary
+
+    async def add_blob(self, blob: BlobUrl) -> None:
+        await self._add("blob", dict(blob))
 
     async def add_chat(self, chat: Chat) -> None:
-        await self.store.context.create_context(
-            thread_id=self.thread_id,
-            opportunity_id=self.user.opportunity_id,
-            user_id=self.user.user_id,
-            channel=self.channel,
-            type="chat",
-            content=json.dumps(chat),
-        )
+        await self._add("chat", [dict(message) for message in chat])
 
     async def add_summary(self, summary: str) -> None:
-        await self.store.context.create_context(
+        await self._add("summary", {"summary": summary})
+
+    async def _add(self, type: ContextType, content: JsonType) -> None:
+        context = NewContext(
             thread_id=self.thread_id,
             opportunity_id=self.user.opportunity_id,
             user_id=self.user.user_id,
             channel=self.channel,
-            type="summary",
-            content=json.dumps(
-                {"summary": summary},
-                ensure_ascii=False,
-            ),
+            content=content,
+            type=type,
         )
+        if not self.buffered:
+            await self.store.context.create_context(**context)
+            return
+
+        last = self._pending[-1] if self._pending else None
+        if (
+            self.coalesce_chats
+            and type == "chat"
+            and last is not None
+            and last["type"] == "chat"
+            and last["channel"] == self.channel
+            and isinstance(last["content"], list)
+            and isinstance(content, list)
+        ):
+            last["content"] = [*last["content"], *content]
+        else:
+            self._pending.append(context)
+
+
+def _summary_cursor(summary: Context) -> tuple[datetime, int]:
+    """Position of the newest chat folded into `summary`."""
+    until = cast(dict[str, Any], summary.content).get("until")
+    if until is None:
+        # Summaries written before cursors were recorded: chats up to the summary itself.
+        return summary.added_timestamp, summary.seq
+    return datetime.fromisoformat(until["added_timestamp"]), until["seq"]
@@ -1,3 +1,4 @@
+from echo.db.models.call_metrics_daily import CallMetricsDaily
 from echo.db.models.campaign import Campaign
 from echo.db.models.campaign_detail import CampaignDetail
 from echo.db.models.context import Context
@@ -10,6 +11,7 @@ from echo.db.models.scheduled_events import ScheduledEvent
 from echo.db.models.user import User
 
 __all__ = [
+    "CallMetricsDaily",
     "CallRecord",
     "Campaign",
     "CampaignDetail",
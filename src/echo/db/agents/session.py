@@ -1,9 +1,12 @@
 from collections.abc import AsyncIterator
 from typing import Any
 
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, SessionTransaction
 
-from echo.db.base import create_engine, create_sessionmaker
+from echo.db.base import PoolConfig, create_engine, create_sessionmaker, get_engine
 
 AGENTS_SEARCH_PATH = "agents,public"
 
@@ -11,11 +14,35 @@ _engine: AsyncEngine | None = None
 _sessionmaker: async_sessionmaker[Any] | None = None
 
 
+class AgentsSession(Session):
+    """Session on the shared core engine that switches to the agents search_path per transaction."""
+
+
+@event.listens_for(AgentsSession, "after_begin")
+def _set_search_path(session: Session, transaction: SessionTransaction, connection: Connection) -> None:
+    connection.exec_driver_sql(f"SET LOCAL search_path TO {AGENTS_SEARCH_PATH}")
+
+
 def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Sessionmaker for the agents schema.
+
+    By default it owns a separate engine whose connections use the agents
+    search_path. With `POSTGRES_SHARE_ENGINE=true` it reuses the core engine's
+    pool instead and sets the search_path with `SET LOCAL` at the start of each
+    transaction, halving the connections held per process.
+    """
     global _engine, _sessionmaker
     if _sessionmaker is None:
-        _engine = create_engine(search_path=AGENTS_SEARCH_PATH)
-        _sessionmaker = create_sessionmaker(_engine)
+        if PoolConfig.from_env().share_engine:
+            _sessionmaker = async_sessionmaker(
+                bind=get_engine(),
+                sync_session_class=AgentsSession,
+                expire_on_commit=False,
+                autoflush=False,
+            )
+        else:
+            _engine = create_engine(search_path=AGENTS_SEARCH_PATH)
+            _sessionmaker = create_sessionmaker(_engine)
     return _sessionmaker
 
 
@@ -24,7 +51,7 @@ async def dispose_engine() -> None:
     if _engine is not None:
         await _engine.dispose()
         _engine = None
-        _sessionmaker = None
+    _sessionmaker = None
 
 
 async def get_session() -> AsyncIterator[AsyncSession]:
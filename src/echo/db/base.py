@@ -1,43 +1,154 @@
 import os
+import time
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
-from typing import Any
+from dataclasses import dataclass
+from typing import Any, Self
 
+from sqlalchemy import Engine, Select, event
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+CHECKOUT_WAIT_KEY = "echo.checkout_wait"
 
 
 class Base(DeclarativeBase):
     pass
 
 
+@dataclass(frozen=True)
+class PoolConfig:
+    """Connection pool settings, read from `POSTGRES_POOL_*` environment variables by `from_env`.
+
+    `pre_ping` costs a round trip per checkout; with it disabled, set `recycle`
+    below the server/proxy idle timeout so stale connections are replaced
+    before they fail. `share_engine` makes the agents schema reuse the core
+    engine instead of opening its own pool.
+    """
+
+    size: int = 10
+    max_overflow: int = 20
+    timeout: float = 30.0
+    recycle: int = -1
+    pre_ping: bool = True
+    share_engine: bool = False
+
+    @classmethod
+    def from_env(cls) -> Self:
+        return cls(
+            size=int(os.getenv("POSTGRES_POOL_SIZE") or cls.size),
+            max_overflow=int(os.getenv("POSTGRES_POOL_MAX_OVERFLOW") or cls.max_overflow),
+            timeout=float(os.getenv("POSTGRES_POOL_TIMEOUT") or cls.timeout),
+            recycle=int(os.getenv("POSTGRES_POOL_RECYCLE") or cls.recycle),
+            pre_ping=(os.getenv("POSTGRES_POOL_PRE_PING") or str(cls.pre_ping)).lower() == "true",
+            share_engine=(os.getenv("POSTGRES_SHARE_ENGINE") or str(cls.share_engine)).lower() == "true",
+        )
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that stamps how long each checkout waited on the connection record.
+
+    The wait (in seconds) is stored under `CHECKOUT_WAIT_KEY` in the record's
+    `info` before the `checkout` event fires, for `echo.utils.monitoring`.
+    """
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        record = super()._do_get()
+        record.info[CHECKOUT_WAIT_KEY] = time.perf_counter() - start
+        return record
+
+
 _engine: AsyncEngine | None = None
 _sessionmaker: async_sessionmaker[Any] | None = None
 
+_read_engine: AsyncEngine | None = None
+_read_sessionmaker: async_sessionmaker[Any] | None = None
+_routing_sessionmaker: async_sessionmaker[Any] | None = None
+
+
+def get_engine() -> AsyncEngine:
+    global _engine
+
+    if _engine is None:
+        _engine = create_engine()
+
+    return _engine
+
 
 def get_sessionmaker() -> async_sessionmaker[Any]:
-    global _engine, _sessionmaker
+    global _sessionmaker
 
     if _sessionmaker is None:
-        _engine = create_engine()
-        _sessionmaker = create_sessionmaker(_engine)
+        _sessionmaker = create_sessionmaker(get_engine())
 
     return _sessionmaker
 
 
+def _get_read_engine() -> AsyncEngine | None:
+    global _read_engine
+
+    if _read_engine is None and os.environ.get("POSTGRES_READ_HOST"):
+        _read_engine = create_engine(
+            build_connection_string(
+                host=os.environ["POSTGRES_READ_HOST"],
+                port=os.environ.get("POSTGRES_READ_PORT"),
+            )
+        )
+
+    return _read_engine
+
+
+def get_read_sessionmaker() -> async_sessionmaker[Any]:
+    """Sessions bound to the read replica (`POSTGRES_READ_HOST`), or to the primary if none is configured."""
+    global _read_sessionmaker
+
+    if _read_sessionmaker is None:
+        read_engine = _get_read_engine()
+        if read_engine is None:
+            return get_sessionmaker()
+        _read_sessionmaker = create_sessionmaker(read_engine)
+
+    return _read_sessionmaker
+
+
+def get_routing_sessionmaker() -> async_sessionmaker[Any]:
+    """Sessions that read from the replica and write to the primary, see `RoutingSession`.
+
+    Falls back to `get_sessionmaker()` when no replica is configured.
+    """
+    global _routing_sessionmaker
+
+    if _routing_sessionmaker is None:
+        read_engine = _get_read_engine()
+        if read_engine is None:
+            return get_sessionmaker()
+        _routing_sessionmaker = create_sessionmaker(get_engine(), replica=read_engine)
+
+    return _routing_sessionmaker
+
+
 async def dispose_engine() -> None:
-    global _engine, _sessionmaker
+    global _engine, _sessionmaker, _read_engine, _read_sessionmaker, _routing_sessionmaker
 
     if _engine is not None:
         await _engine.dispose()
         _engine = None
         _sessionmaker = None
 
+    if _read_engine is not None:
+        await _read_engine.dispose()
+        _read_engine = None
+        _read_sessionmaker = None
+
+    _routing_sessionmaker = None
+
 
 def build_connection_string(
     *,
@@ -77,10 +188,13 @@ def create_engine(
     connection_string: str | None = None,
     *,
     search_path: str | None = None,
+    pool: PoolConfig | None = None,
 ) -> AsyncEngine:
     if not connection_string:
         connection_string = build_connection_string()
 
+    pool = pool or PoolConfig.from_env()
+
     connect_args: dict[str, Any] = {}
     if search_path:
         connect_args["server_settings"] = {"search_path": search_path}
@@ -88,16 +202,66 @@ def create_engine(
     return create_async_engine(
         connection_string,
         echo=False,
-        pool_size=10,
-        max_overflow=20,
-        pool_pre_ping=True,
+        poolclass=TimedQueuePool,
+        pool_size=pool.size,
+        max_overflow=pool.max_overflow,
+        pool_timeout=pool.timeout,
+        pool_recycle=pool.recycle,
+        pool_pre_ping=pool.pre_ping,
         connect_args=connect_args,
     )
 
 
+class RoutingSession(Session):
+    """Session that sends opted-in SELECTs to a read replica and everything else to the primary.
+
+    Only SELECTs marked with `.execution_options(replica=True)` may go to the
+    replica, which the store's `get_*`/`query_*`/`stream_*` read methods do;
+    lookups inside write methods stay on the primary. The first statement sent
+    to the primary pins the transaction there, so it reads its own writes, until
+    it commits or rolls back.
+    """
+
+    def __init__(self, *, primary: Engine, replica: Engine, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.primary = primary
+        self.replica = replica
+        self.pinned = False
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kwargs: Any) -> Engine:
+        if (
+            not self.pinned
+            and not self._flushing
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+            and clause.get_execution_options().get("replica", False)
+        ):
+            return self.replica
+        self.pinned = True
+        return self.primary
+
+
+@event.listens_for(RoutingSession, "after_commit")
+@event.listens_for(RoutingSession, "after_rollback")
+def _unpin(session: Session) -> None:
+    if isinstance(session, RoutingSession):
+        session.pinned = False
+
+
 def create_sessionmaker(
     engine: AsyncEngine,
+    *,
+    replica: AsyncEngine | None = None,
 ) -> async_sessionmaker[AsyncSession]:
+    if replica is not None:
+        return async_sessionmaker(
+            sync_session_class=RoutingSession,
+            primary=engine.sync_engine,
+            replica=replica.sync_engine,
+            expire_on_commit=False,
+            autoflush=False,
+        )
+
     return async_sessionmaker(
         bind=engine,
         expire_on_commit=False,
@@ -105,6 +269,17 @@ def create_sessionmaker(
     )
 
 
+async def get_driver_connection(session: AsyncSession) -> Any:
+    """Return the raw asyncpg connection behind `session`'s current transaction.
+
+    Used for driver-level operations such as binary `COPY` that SQLAlchemy does
+    not expose. Statements run on it share the session's transaction.
+    """
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    return raw.driver_connection
+
+
 @asynccontextmanager
 async def session_scope(
     sessionmaker: async_sessionmaker[AsyncSession],
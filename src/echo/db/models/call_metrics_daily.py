@@ -0,0 +1,51 @@
+from datetime import date, datetime
+
+from sqlalchemy import (
+    BigInteger,
+    Date,
+    DateTime,
+    Identity,
+    Text,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from echo.db.base import Base
+
+
+class CallMetricsDaily(Base):
+    """Daily rollup of `call_history_details`, maintained by `AnalyticsTable.refresh_campaign_rollup`."""
+
+    __tablename__ = "call_metrics_daily"
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+
+    campaign_id: Mapped[str] = mapped_column(Text, nullable=False)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    market: Mapped[str | None] = mapped_column(Text)
+    plancode: Mapped[str | None] = mapped_column(Text)
+    score: Mapped[str | None] = mapped_column(Text)
+
+    calls: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    answered: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    voicemails: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    callbacks: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    frustrated: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    hallucinations: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    duration_total: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    duration_calls: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint(
+            "campaign_id",
+            "day",
+            "market",
+            "plancode",
+            "score",
+            name="uq_call_metrics_daily_bucket",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
@@ -3,11 +3,15 @@ from typing import Any
 from uuid import UUID
 
 from sqlalchemy import (
-    JSON,
+    BigInteger,
     DateTime,
+    Identity,
+    Index,
     String,
     func,
+    text,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
 from echo.db.base import Base
@@ -22,10 +26,22 @@ class Context(Base):
     thread_id: Mapped[UUID] = mapped_column()
     opportunity_id: Mapped[str] = mapped_column()
     user_id: Mapped[UUID] = mapped_column()
-    content: Mapped[str] = mapped_column(JSON)
+    content: Mapped[JsonType] = mapped_column(JSONB)
     type: Mapped[str] = mapped_column()
     channel: Mapped[str] = mapped_column()
     added_timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    # Rows added in one transaction share `added_timestamp` (the transaction start); `seq` orders them.
+    seq: Mapped[int] = mapped_column(BigInteger, Identity())
     updated_timestamp: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+
+    __table_args__ = (
+        Index(
+            "ix_context_opportunity_added",
+            "opportunity_id",
+            text("added_timestamp DESC"),
+            text("seq DESC"),
+            postgresql_include=["type", "channel"],
+        ),
+    )
@@ -1,21 +1,32 @@
 import uuid
 from datetime import datetime
+from typing import Any
 
 from sqlalchemy import (
     ARRAY,
     UUID,
     DateTime,
     Index,
+    Table,
     Text,
+    event,
     func,
     text,
 )
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import Mapped, mapped_column
 
 from echo.db.base import Base
 
 
 class CallRecord(Base):
+    """Per-call analytics, range-partitioned by month on `processed_at`.
+
+    Monthly partitions are named `call_history_details_pYYYYMM` and managed by
+    `AnalyticsTable.ensure_partitions` / `AnalyticsTable.detach_partitions`;
+    rows outside every monthly range land in `call_history_details_default`.
+    """
+
     __tablename__ = "call_history_details"
 
     insight_id: Mapped[uuid.UUID] = mapped_column(UUID, primary_key=True, default=uuid.uuid4)
@@ -61,7 +72,11 @@ class CallRecord(Base):
     duration_seconds: Mapped[int | None] = mapped_column()
     recording_url: Mapped[str | None] = mapped_column(Text)
 
-    processed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    processed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=True,
+        server_default=func.now(),
+    )
 
     __table_args__ = (
         Index("ix_call_history_campaign_id", "campaign_id"),
@@ -80,4 +95,10 @@ class CallRecord(Base):
             "campaign_id",
             text("processed_at DESC"),
         ),
+        {"postgresql_partition_by": "RANGE (processed_at)"},
     )
+
+
+@event.listens_for(CallRecord.__table__, "after_create")
+def _create_default_partition(target: Table, connection: Connection, **kw: Any) -> None:
+    connection.execute(text(f"CREATE TABLE {target.name}_default PARTITION OF {target.name} DEFAULT"))
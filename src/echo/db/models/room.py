@@ -3,7 +3,6 @@ from typing import Any
 from uuid import UUID
 
 from sqlalchemy import (
-    JSON,
     DateTime,
     Index,
     String,
@@ -24,7 +23,7 @@ class Room(Base):
     start_timestamp: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     end_timestamp: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     report_url: Mapped[str | None] = mapped_column()
-    metadata_: Mapped[dict[str, Any] | None] = mapped_column("metadata", JSON)
+    metadata_: Mapped[dict[str, Any] | None] = mapped_column("metadata", JSONB)
     timeline: Mapped[list[dict[str, Any]]] = mapped_column(
         JSONB,
         default=list,
@@ -3,6 +3,7 @@ from typing import Any
 
 from sqlalchemy import (
     DateTime,
+    Index,
     Text,
     func,
 )
@@ -23,3 +24,11 @@ class ScheduledCall(Base):
     updated_timestamp: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+
+    __table_args__ = (
+        Index(
+            "ix_schedule_calls_dispatch",
+            "scheduled_at",
+            postgresql_where=(status.in_(["pending", "dispatching"])),
+        ),
+    )
@@ -1,18 +1,30 @@
 import inspect
 import os
+from functools import cache
 
 import echo.config as cfg
 from echo.logger import get_logger
 
 log = get_logger(__name__)
 
+DEFAULT_LANGFUSE_PROMPT_CACHE_TTL = 300
+
 
 def load_langfuse_prompt(prompt_name: str) -> str:
+    """Compile the text prompt `prompt_name` from Langfuse.
+
+    Prompts are cached by the Langfuse client for
+    `LANGFUSE_PROMPT_CACHE_TTL_SECONDS` (default 5 minutes). Once expired, the
+    cached version keeps being served while it is refreshed in a background
+    thread, and also when the refresh fails, so only the first lookup of a
+    prompt waits on Langfuse.
+    """
     from langfuse import get_client
     from langfuse.model import TextPromptClient
 
+    ttl = int(os.getenv("LANGFUSE_PROMPT_CACHE_TTL_SECONDS") or DEFAULT_LANGFUSE_PROMPT_CACHE_TTL)
     langfuse = get_client()
-    prompt = langfuse.get_prompt(prompt_name)
+    prompt = langfuse.get_prompt(prompt_name, cache_ttl_seconds=ttl)
 
     if not isinstance(prompt, TextPromptClient):
         raise NotImplementedError("Prompt must be type text")
@@ -20,19 +32,29 @@ def load_langfuse_prompt(prompt_name: str) -> str:
     return str(prompt.compile())
 
 
-def load_prompt_by_name(prompt_name: str) -> str:
-    filepath = os.path.join(cfg.PROMPTS_FOLDER, f"{prompt_name}.txt")
-
+@cache
+def _read_prompt(filepath: str) -> str:
     with open(filepath) as f:
         return f.read()
 
 
+def clear_prompt_cache() -> None:
+    """Forget the prompt files read so far, so edits are picked up."""
+    _read_prompt.cache_clear()
+
+
+def load_prompt_by_name(prompt_name: str) -> str:
+    return _read_prompt(os.path.join(cfg.PROMPTS_FOLDER, f"{prompt_name}.txt"))
+
+
 def load_component_prompt(prompt_name: str = "prompt") -> str:
-    caller_frame = inspect.stack()[1]
-    caller_file = caller_frame.filename
+    # Only the caller's frame is needed; inspect.stack() would build the whole stack with source context.
+    frame = inspect.currentframe()
+    caller = frame.f_back if frame is not None else None
+    if caller is None:
+        raise RuntimeError("load_component_prompt needs the caller's frame to locate the prompt")
+    caller_file = caller.f_code.co_filename
+    del frame, caller
     caller_dir = os.path.dirname(os.path.abspath(caller_file))
 
-    filepath = os.path.join(caller_dir, f"{prompt_name}.txt")
-
-    with open(filepath) as f:
-        return f.read()
+    return _read_prompt(os.path.join(caller_dir, f"{prompt_name}.txt"))
@@ -5,7 +5,10 @@ from collections.abc import AsyncIterator, Sequence
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from typing import Any, BinaryIO, cast
+from urllib.parse import unquote, urlparse
 
+from azure.core.pipeline.transport import AioHttpTransport, AsyncHttpTransport
+from azure.core.rest import AsyncHttpResponse, HttpRequest
 from azure.storage.blob.aio import BlobClient, BlobServiceClient
 
 from echo.logger import get_logger
@@ -21,12 +24,33 @@ from echo.storage.base import (
 log = get_logger(__name__)
 
 
+class _SharedTransport(AsyncHttpTransport[HttpRequest, AsyncHttpResponse]):
+    """Lends a long-lived transport to short-lived clients without letting them close it."""
+
+    def __init__(self, transport: AsyncHttpTransport[HttpRequest, AsyncHttpResponse]) -> None:
+        self._transport = transport
+
+    async def send(self, request: HttpRequest, **kwargs: Any) -> AsyncHttpResponse:
+        return await self._transport.send(request, **kwargs)
+
+    async def open(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def __aexit__(self, *args: object) -> None:
+        pass
+
+
 class AzureStorage(Storage):
     def __init__(self) -> None:
         self.account_name = os.environ["AZURE_ACCOUNT_NAME"]
         self.sessions_container_name = os.environ["AZURE_STORAGE_CONTAINER_SESSIONS_NAME"]
         self.service_client = BlobServiceClient.from_connection_string(os.environ["AZURE_STORAGE_CONNECTION_STRING"])
         self.sessions_client = self.service_client.get_container_client(self.sessions_container_name)
+        # Clients built from SAS or foreign-account URLs share one connection pool.
+        self.url_transport = AioHttpTransport()
 
     async def fetch_report(self, room_id: str, sas: bool = False) -> dict[str, Any]:
         blob_url = f"https://{self.account_name}.blob.core.windows.net/{self.sessions_container_name}/recordings/{room_id}/session-report.json"
@@ -150,15 +174,28 @@ class AzureStorage(Storage):
             log.warning(f"Failed to load sidecar: {blob_name}", exc_info=True)
             return None
 
+    def _blob_client_from_url(self, blob_url: str, sas: bool = False) -> BlobClient:
+        # Blobs in our own account reuse the service client's pipeline (and its
+        # connection pool); closing the derived client leaves the transport open.
+        parsed = urlparse(blob_url)
+        if not sas and parsed.netloc == f"{self.account_name}.blob.core.windows.net":
+            container, _, blob_name = parsed.path.lstrip("/").partition("/")
+            if container and blob_name:
+                return self.service_client.get_blob_client(container, unquote(blob_name))
+
+        transport = _SharedTransport(self.url_transport)
+        if sas:
+            return BlobClient.from_blob_url(blob_url, transport=transport)
+
+        return BlobClient.from_blob_url(
+            blob_url,
+            credential=os.environ["AZURE_ACCOUNT_KEY"],
+            transport=transport,
+        )
+
     async def get_blob_content(self, blob_url: str, sas: bool = False) -> bytes | None:
         try:
-            if sas:
-                client = BlobClient.from_blob_url(blob_url)
-            else:
-                client = BlobClient.from_blob_url(
-                    blob_url,
-                    credential=os.environ["AZURE_ACCOUNT_KEY"],
-                )
+            client = self._blob_client_from_url(blob_url, sas)
 
             async with client:
                 stream = await client.download_blob()
@@ -280,10 +317,7 @@ class AzureStorage(Storage):
             raise
 
     async def stream_blob(self, url: str) -> AsyncIterator[bytes]:
-        blob_client = BlobClient.from_blob_url(
-            url,
-            credential=os.environ["AZURE_ACCOUNT_KEY"],
-        )
+        blob_client = self._blob_client_from_url(url)
         async with blob_client:
             stream = await blob_client.download_blob()
             async for chunk in stream.chunks():
@@ -291,10 +325,7 @@ class AzureStorage(Storage):
 
     async def get_blob_size(self, url: str) -> int | None:
         try:
-            blob_client = BlobClient.from_blob_url(
-                url,
-                credential=os.environ["AZURE_ACCOUNT_KEY"],
-            )
+            blob_client = self._blob_client_from_url(url)
             async with blob_client:
                 props = await blob_client.get_blob_properties()
                 return props.size
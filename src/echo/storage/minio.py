@@ -211,7 +211,8 @@ class MinioStorage(Storage):
         blob_name = f"recordings/{room_sid}/session-report.json"
 
         try:
-            self.client.put_object(
+            await asyncio.to_thread(
+                self.client.put_object,
                 Bucket=self.sessions_bucket,
                 Key=blob_name,
                 Body=json_data,
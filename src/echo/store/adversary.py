@@ -1,8 +1,10 @@
+from collections.abc import Sequence
 from datetime import UTC, datetime
 from typing import Any, cast
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import func, literal, select, update
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm.attributes import flag_modified
 
@@ -94,18 +96,26 @@ class AdversaryTable:
         message: str,
         timestamp: datetime | None = None,
     ) -> Adversary | None:
-        adversary = await self.get(adversary_id)
-        if not adversary:
-            return None
-
         entry = {
             "sender": sender,
             "message": message,
             "timestamp": (timestamp or datetime.now(UTC)).isoformat(),
         }
-        adversary.messages.append(entry)
-        flag_modified(adversary, "messages")
-
-        await self.session.flush()
-        await self.session.refresh(adversary)
-        return adversary
+        return await self.append_messages(adversary_id, [entry])
+
+    async def append_messages(self, adversary_id: UUID, entries: Sequence[dict[str, Any]]) -> Adversary | None:
+        """Append message entries with a single `UPDATE ... SET messages = messages || ...`.
+
+        The append happens server-side under the row lock, so concurrent appends
+        are never lost and the stored conversation is not rewritten. The returned
+        adversary is refreshed from the `RETURNING` row.
+        """
+        stmt = (
+            update(Adversary)
+            .where(Adversary.id == adversary_id)
+            .values(messages=Adversary.messages.op("||")(literal(list(entries), JSONB)))
+            .returning(Adversary)
+            .execution_options(populate_existing=True)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
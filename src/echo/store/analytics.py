@@ -1,12 +1,29 @@
-from datetime import datetime
-from typing import Protocol, cast
+from collections.abc import AsyncIterator, Iterable, Sequence
+from datetime import UTC, datetime
+from typing import Any, Literal, Protocol, TypedDict, cast
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import (
+    Date,
+    Select,
+    cast as sql_cast,
+    delete,
+    func,
+    literal,
+    select,
+    text,
+    tuple_,
+)
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from echo.db.models.call_metrics_daily import CallMetricsDaily
 from echo.db.models.insight import CallRecord
+from echo.store.projections import CallRecordSummary, CampaignSummary, project, projection_columns
+
+type SummaryGroupBy = Literal["market", "plancode", "day"]
+
+CALL_HISTORY_PARTITION_PREFIX = f"{CallRecord.__tablename__}_p"
 
 
 class CallInsightProtocol(Protocol):
@@ -33,6 +50,66 @@ class CallInsightProtocol(Protocol):
     compliance_risk_detected: bool
 
 
+class CallMetric(TypedDict):
+    campaign_id: str
+    room_id: str
+    opportunity_id: str
+    thread_id: UUID | None
+    user_name: str | None
+    user_phone: str | None
+    user_email: str | None
+    plancode: str | None
+    market: str | None
+    duration: int
+    insight: CallInsightProtocol
+    recording_url: str
+
+
+def _call_record_values(metric: CallMetric) -> dict[str, Any]:
+    insight = metric["insight"]
+    return {
+        "campaign_id": metric["campaign_id"],
+        "room_id": metric["room_id"],
+        "opportunity_id": metric["opportunity_id"],
+        "thread_id": metric["thread_id"],
+        "user_name": metric["user_name"],
+        "user_phone": metric["user_phone"],
+        "user_email": metric["user_email"],
+        "plancode": metric["plancode"],
+        "market": metric["market"],
+        "answer": insight.answer,
+        "voicemail_answer": insight.voicemail_answer,
+        "availability": insight.availability,
+        "recording_consent": insight.recording_consent,
+        "motivation": insight.motivation,
+        "work_status": insight.work_status,
+        "financial_interest": insight.financial_interest,
+        "financial_topics": insight.financial_topics,
+        "financial_details": insight.financial_details,
+        "objection": insight.objection,
+        "score": insight.score,
+        "summary": insight.summary,
+        "callback_requested": insight.callback_requested,
+        "callback_reference_day": insight.callback_reference_day,
+        "callback_at": insight.callback_at,
+        "quality_notes": insight.quality_notes,
+        "user_satisfaction": insight.user_satisfaction,
+        "frustration": insight.frustration,
+        "hallucination_detected": insight.hallucination_detected,
+        "compliance_risk_detected": insight.compliance_risk_detected,
+        "duration_seconds": metric["duration"],
+        "recording_url": metric["recording_url"],
+    }
+
+
+async def _advisory_lock(session: AsyncSession, keys: Iterable[str]) -> None:
+    """Take transaction-scoped advisory locks on `keys`, in a fixed order so that callers cannot deadlock."""
+    await session.execute(
+        text("SELECT pg_advisory_xact_lock(hashtextextended(key, 0)) FROM unnest(CAST(:keys AS text[])) AS key"),
+        {"keys": sorted(set(keys))},
+    )
+
+
 class AnalyticsTable:
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
@@ -53,47 +130,415 @@ class AnalyticsTable:
         recording_url: str,
     ) -> None:
         stmt = insert(CallRecord).values(
-            campaign_id=campaign_id,
-            room_id=room_id,
-            opportunity_id=opportunity_id,
-            thread_id=thread_id,
-            user_name=user_name,
-            user_phone=user_phone,
-            user_email=user_email,
-            plancode=plancode,
-            market=market,
-            answer=insight.answer,
-            voicemail_answer=insight.voicemail_answer,
-            availability=insight.availability,
-            recording_consent=insight.recording_consent,
-            motivation=insight.motivation,
-            work_status=insight.work_status,
-            financial_interest=insight.financial_interest,
-            financial_topics=insight.financial_topics,
-            financial_details=insight.financial_details,
-            objection=insight.objection,
-            score=insight.score,
-            summary=insight.summary,
-            callback_requested=insight.callback_requested,
-            callback_reference_day=insight.callback_reference_day,
-            callback_at=insight.callback_at,
-            quality_notes=insight.quality_notes,
-            user_satisfaction=insight.user_satisfaction,
-            frustration=insight.frustration,
-            hallucination_detected=insight.hallucination_detected,
-            compliance_risk_detected=insight.compliance_risk_detected,
-            duration_seconds=duration,
-            recording_url=recording_url,
+            _call_record_values(
+                CallMetric(
+                    campaign_id=campaign_id,
+                    room_id=room_id,
+                    opportunity_id=opportunity_id,
+                    thread_id=thread_id,
+                    user_name=user_name,
+                    user_phone=user_phone,
+                    user_email=user_email,
+                    plancode=plancode,
+                    market=market,
+                    duration=duration,
+                    insight=insight,
+                    recording_url=recording_url,
+                )
+            )
         )
         await self.session.execute(stmt)
 
-    async def get_call_record(self, room_id: str) -> CallRecord | None:
-        result = await self.session.execute(select(CallRecord).where(CallRecord.room_id == room_id))
+    async def insert_call_metrics(self, metrics: Sequence[CallMetric], *, upsert: bool = False) -> None:
+        """Insert many call records with a single batched statement.
+
+        With `upsert=True`, existing records for the same `room_id` are replaced
+        instead of duplicated, so reprocessing a room keeps one row per call. If a
+        room appears more than once in `metrics`, the last entry wins. The rooms
+        are locked until the transaction ends, so concurrent upserts of a room
+        run one after the other instead of each keeping its own row.
+        """
+        if not metrics:
+            return
+
+        rows = [_call_record_values(metric) for metric in metrics]
+
+        if upsert:
+            rows = list({row["room_id"]: row for row in rows}.values())
+            # A unique key on room_id is not possible here: unique constraints on a
+            # partitioned table must include processed_at, which changes on every
+            # reprocessing. Serialize on the room instead.
+            await _advisory_lock(self.session, (f"{CallRecord.__tablename__}:{row['room_id']}" for row in rows))
+            await self.session.execute(
+                delete(CallRecord).where(CallRecord.room_id.in_([row["room_id"] for row in rows]))
+            )
+
+        await self.session.execute(insert(CallRecord), rows)
+
+    async def get_call_record(self, room_id: str, *, since: datetime | None = None) -> CallRecord | None:
+        stmt = select(CallRecord).where(CallRecord.room_id == room_id)
+        if since is not None:
+            stmt = stmt.where(CallRecord.processed_at >= since)
+        result = await self.session.execute(stmt.execution_options(replica=True))
         return cast(CallRecord | None, result.scalar_one_or_none())
 
-    async def get_call_records(self, campaign_id: str | None = None) -> list[CallRecord]:
+    async def get_call_records(
+        self,
+        campaign_id: str | None = None,
+        *,
+        since: datetime | None = None,
+    ) -> list[CallRecord]:
+        """Return call records, optionally for one campaign.
+
+        `since` bounds `processed_at` so Postgres only scans the monthly
+        partitions from that date on; pass it whenever the campaign is recent.
+        """
         stmt = select(CallRecord)
         if campaign_id is not None:
             stmt = stmt.where(CallRecord.campaign_id == campaign_id)
-        result = await self.session.execute(stmt)
+        if since is not None:
+            stmt = stmt.where(CallRecord.processed_at >= since)
+        result = await self.session.execute(stmt.execution_options(replica=True))
         return cast(list[CallRecord], result.scalars().all())
+
+    async def get_call_records_page(
+        self,
+        campaign_id: str,
+        *,
+        limit: int = 100,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> list[CallRecord]:
+        """Return a campaign's call records, newest first, one keyset page at a time.
+
+        Pass the `(processed_at, insight_id)` of the last record of a page as
+        `after` to fetch the next one. The query walks
+        `ix_call_history_details_campaign_processed`.
+        """
+        stmt = self._campaign_page(select(CallRecord), campaign_id, limit=limit, after=after)
+        result = await self.session.execute(stmt.execution_options(replica=True))
+        return cast(list[CallRecord], result.scalars().all())
+
+    async def get_call_record_summaries(
+        self,
+        campaign_id: str,
+        *,
+        limit: int = 100,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> list[CallRecordSummary]:
+        """Lightweight variant of `get_call_records_page` for list views.
+
+        Selects only the summary columns and builds plain slotted dataclasses,
+        skipping ORM hydration and the session's identity map.
+        """
+        stmt = self._campaign_page(
+            select(*projection_columns(CallRecord, CallRecordSummary)),
+            campaign_id,
+            limit=limit,
+            after=after,
+        )
+        result = await self.session.execute(stmt.execution_options(replica=True))
+        return project(CallRecordSummary, result)
+
+    @staticmethod
+    def _campaign_page[S: Select[Any]](
+        stmt: S,
+        campaign_id: str,
+        *,
+        limit: int,
+        after: tuple[datetime, UUID] | None,
+    ) -> S:
+        stmt = (
+            stmt.where(CallRecord.campaign_id == campaign_id)
+            .order_by(CallRecord.processed_at.desc(), CallRecord.insight_id.desc())
+            .limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(CallRecord.processed_at, CallRecord.insight_id) < tuple_(*map(literal, after)))
+        return stmt
+
+    async def stream_call_records(
+        self,
+        campaign_id: str | None = None,
+        *,
+        since: datetime | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[CallRecord]:
+        stmt = select(CallRecord).execution_options(yield_per=batch_size, replica=True)
+        if campaign_id is not None:
+            stmt = stmt.where(CallRecord.campaign_id == campaign_id).order_by(CallRecord.processed_at.desc())
+        if since is not None:
+            stmt = stmt.where(CallRecord.processed_at >= since)
+        result = await self.session.stream_scalars(stmt)
+        async for record in result:
+            yield record
+
+    async def get_latest_call_records(
+        self,
+        campaign_id: str,
+        *,
+        since: datetime | None = None,
+    ) -> list[CallRecord]:
+        stmt = (
+            select(CallRecord)
+            .distinct(CallRecord.opportunity_id)
+            .where(CallRecord.campaign_id == campaign_id)
+            .order_by(CallRecord.opportunity_id, CallRecord.processed_at.desc())
+        )
+        if since is not None:
+            stmt = stmt.where(CallRecord.processed_at >= since)
+        result = await self.session.execute(stmt.execution_options(replica=True))
+        return cast(list[CallRecord], result.scalars().all())
+
+    async def campaign_summary(
+        self,
+        campaign_id: str,
+        *,
+        group_by: SummaryGroupBy | None = None,
+        since: datetime | None = None,
+        use_rollup: bool = False,
+    ) -> list[CampaignSummary]:
+        """Compute campaign KPIs in SQL, optionally bucketed by market, plancode or day.
+
+        Returns one summary per bucket (a single one with `bucket=None` when
+        ungrouped). With `use_rollup=True` the figures are read from
+        `call_metrics_daily` instead of scanning `call_history_details`; keep it up to
+        date with `refresh_campaign_rollup`. `since` restricts the figures to
+        calls processed from that moment on (from that day on for the rollup).
+        """
+        stmt: Select[Any]
+        if use_rollup:
+            rollup_bucket = {
+                None: literal(None),
+                "market": CallMetricsDaily.market,
+                "plancode": CallMetricsDaily.plancode,
+                "day": CallMetricsDaily.day,
+            }[group_by]
+            stmt = (
+                select(
+                    rollup_bucket.label("bucket"),
+                    CallMetricsDaily.score,
+                    func.sum(CallMetricsDaily.calls),
+                    func.sum(CallMetricsDaily.answered),
+                    func.sum(CallMetricsDaily.voicemails),
+                    func.sum(CallMetricsDaily.callbacks),
+                    func.sum(CallMetricsDaily.frustrated),
+                    func.sum(CallMetricsDaily.hallucinations),
+                    func.sum(CallMetricsDaily.duration_total),
+                    func.sum(CallMetricsDaily.duration_calls),
+                )
+                .where(CallMetricsDaily.campaign_id == campaign_id)
+                .group_by(rollup_bucket, CallMetricsDaily.score)
+            )
+            if since is not None:
+                stmt = stmt.where(CallMetricsDaily.day >= since.date())
+        else:
+            bucket = {
+                None: literal(None),
+                "market": CallRecord.market,
+                "plancode": CallRecord.plancode,
+                "day": _call_day(),
+            }[group_by]
+            stmt = (
+                select(bucket.label("bucket"), CallRecord.score, *_call_aggregates())
+                .where(CallRecord.campaign_id == campaign_id)
+                .group_by(bucket, CallRecord.score)
+            )
+            if since is not None:
+                stmt = stmt.where(CallRecord.processed_at >= since)
+
+        result = await self.session.execute(stmt.execution_options(replica=True))
+
+        totals: dict[Any, list[int]] = {}
+        scores: dict[Any, dict[str | None, int]] = {}
+        for bucket_value, score, *counts in result:
+            acc = totals.setdefault(bucket_value, [0] * len(counts))
+            for i, count in enumerate(counts):
+                acc[i] += int(count or 0)
+            scores.setdefault(bucket_value, {})[score] = int(counts[0] or 0)
+
+        summaries: list[CampaignSummary] = []
+        for bucket_value, (
+            calls,
+            answered,
+            voicemails,
+            callbacks,
+            frustrated,
+            hallucinations,
+            duration_total,
+            duration_calls,
+        ) in totals.items():
+            summaries.append(
+                CampaignSummary(
+                    bucket=bucket_value,
+                    calls=calls,
+                    answer_rate=answered / calls if calls else 0.0,
+                    voicemail_rate=voicemails / calls if calls else 0.0,
+                    callback_rate=callbacks / calls if calls else 0.0,
+                    frustration_rate=frustrated / calls if calls else 0.0,
+                    hallucination_rate=hallucinations / calls if calls else 0.0,
+                    avg_duration_seconds=duration_total / duration_calls if duration_calls else None,
+                    score_distribution=scores[bucket_value],
+                )
+            )
+        return summaries
+
+    async def refresh_campaign_rollup(self, campaign_id: str, *, full: bool = False) -> None:
+        """Incrementally refresh `call_metrics_daily` for a campaign.
+
+        Only days from the last rolled-up day onward are recomputed, so the cost
+        follows the volume of recent calls. Use `full=True` to rebuild every day,
+        e.g. after backfills that rewrite older records.
+        """
+        since = None
+        if not full:
+            since = await self.session.scalar(
+                select(func.max(CallMetricsDaily.day)).where(CallMetricsDaily.campaign_id == campaign_id)
+            )
+
+        clear = delete(CallMetricsDaily).where(CallMetricsDaily.campaign_id == campaign_id)
+        if since is not None:
+            clear = clear.where(CallMetricsDaily.day >= since)
+        await self.session.execute(clear)
+
+        day = _call_day()
+        aggregate = (
+            select(
+                literal(campaign_id),
+                day,
+                CallRecord.market,
+                CallRecord.plancode,
+                CallRecord.score,
+                *_call_aggregates(),
+            )
+            .where(CallRecord.campaign_id == campaign_id)
+            .group_by(day, CallRecord.market, CallRecord.plancode, CallRecord.score)
+        )
+        if since is not None:
+            aggregate = aggregate.where(CallRecord.processed_at >= since)
+
+        columns = [
+            "campaign_id",
+            "day",
+            "market",
+            "plancode",
+            "score",
+            "calls",
+            "answered",
+            "voicemails",
+            "callbacks",
+            "frustrated",
+            "hallucinations",
+            "duration_total",
+            "duration_calls",
+        ]
+        stmt = insert(CallMetricsDaily).from_select(columns, aggregate)
+        # A concurrent refresh of the same campaign may insert the same buckets
+        # between our delete and insert; overwrite them instead of adding rows.
+        await self.session.execute(
+            stmt.on_conflict_do_update(
+                constraint="uq_call_metrics_daily_bucket",
+                set_={column: stmt.excluded[column] for column in columns[5:]} | {"refreshed_at": func.now()},
+            )
+        )
+
+    async def get_partitions(self) -> list[str]:
+        """Names of the monthly `call_history_details` partitions, oldest first."""
+        result = await self.session.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = CAST(:parent AS regclass) AND c.relname LIKE :prefix ORDER BY c.relname"
+            ),
+            {"parent": CallRecord.__tablename__, "prefix": f"{CALL_HISTORY_PARTITION_PREFIX}%"},
+        )
+        return list(result.scalars().all())
+
+    async def ensure_partitions(self, *, months_ahead: int = 2, now: datetime | None = None) -> list[str]:
+        """Create the monthly partitions from the current month to `months_ahead` months ahead.
+
+        Rows already sitting in the default partition for a new month are moved
+        into it before it is attached. Run it regularly (e.g. daily) so inserts
+        never fall through to the default partition. Returns the created names.
+        """
+        existing = set(await self.get_partitions())
+        month = _month_start(now or datetime.now(UTC))
+        created: list[str] = []
+
+        for _ in range(months_ahead + 1):
+            upper = _next_month(month)
+            name = _partition_name(month)
+            if name not in existing:
+                await self._create_partition(name, month, upper)
+                created.append(name)
+            month = upper
+
+        return created
+
+    async def _create_partition(self, name: str, lower: datetime, upper: datetime) -> None:
+        parent = CallRecord.__tablename__
+        bounds = {"lower": lower, "upper": upper}
+        await self.session.execute(text(f'CREATE TABLE "{name}" (LIKE {parent} INCLUDING DEFAULTS)'))
+        await self.session.execute(
+            text(
+                f"WITH moved AS (DELETE FROM {parent}_default "
+                "WHERE processed_at >= :lower AND processed_at < :upper RETURNING *) "
+                f'INSERT INTO "{name}" SELECT * FROM moved'
+            ),
+            bounds,
+        )
+        await self.session.execute(
+            text(
+                f'ALTER TABLE {parent} ATTACH PARTITION "{name}" '
+                f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+        )
+
+    async def detach_partitions(self, before: datetime, *, drop: bool = False) -> list[str]:
+        """Retention hook: detach the monthly partitions that end on or before `before`.
+
+        Detached partitions stay behind as standalone tables so they can be
+        archived (e.g. `pg_dump -t`) and dropped later; pass `drop=True` to drop
+        them right away. Refresh `call_metrics_daily` first: the rollup keeps the
+        aggregates, but `refresh_campaign_rollup(full=True)` only rebuilds days
+        still present. Returns the detached names.
+        """
+        cutoff = _partition_name(_month_start(before))
+        detached: list[str] = []
+
+        for name in await self.get_partitions():
+            if name >= cutoff:
+                break
+            await self.session.execute(text(f'ALTER TABLE {CallRecord.__tablename__} DETACH PARTITION "{name}"'))
+            if drop:
+                await self.session.execute(text(f'DROP TABLE "{name}"'))
+            detached.append(name)
+
+        return detached
+
+
+def _month_start(moment: datetime) -> datetime:
+    return moment.astimezone(UTC).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(month: datetime) -> datetime:
+    return month.replace(year=month.year + 1, month=1) if month.month == 12 else month.replace(month=month.month + 1)
+
+
+def _partition_name(month: datetime) -> str:
+    return f"{CALL_HISTORY_PARTITION_PREFIX}{month:%Y%m}"
+
+
+def _call_day() -> Any:
+    return sql_cast(CallRecord.processed_at, Date)
+
+
+def _call_aggregates() -> list[Any]:
+    return [
+        func.count(),
+        func.count().filter(CallRecord.answer.is_(True)),
+        func.count().filter(CallRecord.voicemail_answer.is_(True)),
+        func.count().filter(CallRecord.callback_requested.is_(True)),
+        func.count().filter(CallRecord.frustration.is_(True)),
+        func.count().filter(CallRecord.hallucination_detected.is_(True)),
+        func.coalesce(func.sum(CallRecord.duration_seconds), 0),
+        func.count(CallRecord.duration_seconds),
+    ]
@@ -0,0 +1,169 @@
+from collections import Counter
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any, NotRequired, TypedDict, cast
+from uuid import UUID
+
+from sqlalchemy import (
+    DateTime,
+    String,
+    and_,
+    case,
+    cast as sql_cast,
+    column,
+    exists,
+    func,
+    or_,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import (
+    JSONB,
+    UUID as PG_UUID,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from echo.db.models.campaign import Campaign, CampaignStatus
+from echo.db.models.campaign_detail import AttemptData, CampaignDetail, CampaignUserStatus
+
+
+class CallAttempt(TypedDict):
+    detail_id: UUID
+    status: CampaignUserStatus
+    called_at: datetime
+    next_call_after: datetime | None
+    failure_reason: NotRequired[str]
+
+
+def _attempt_data(attempt: CallAttempt) -> AttemptData:
+    next_call_after = attempt["next_call_after"]
+    data = AttemptData(
+        called_at=attempt["called_at"].isoformat(),
+        next_call_after=next_call_after.isoformat() if next_call_after else None,
+    )
+    if "failure_reason" in attempt:
+        data["failure_reason"] = attempt["failure_reason"]
+    return data
+
+
+class CampaignsTable:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def get_campaign(self, campaign_id: UUID) -> Campaign | None:
+        result = await self.session.execute(
+            select(Campaign).where(Campaign.id == campaign_id).execution_options(replica=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_dialable_campaigns(self) -> list[Campaign]:
+        """Active campaigns whose scheduled start has passed."""
+        stmt = select(Campaign).where(
+            Campaign.status == CampaignStatus.ACTIVE,
+            or_(Campaign.scheduled_at.is_(None), Campaign.scheduled_at <= func.now()),
+        )
+        result = await self.session.execute(stmt.execution_options(replica=True))
+        return cast(list[Campaign], result.scalars().all())
+
+    async def claim_users(self, campaign_id: UUID, limit: int = 100) -> list[CampaignDetail]:
+        """Atomically claim up to `limit` callable users of a campaign by moving them to `QUEUED`.
+
+        Callable users are `PENDING` ones and `RETRY` ones whose last attempt's
+        `next_call_after` has passed, in an active campaign that has started.
+        Candidates come from `ix_campaign_status` and are locked with
+        `FOR UPDATE SKIP LOCKED`, so dialer replicas claim disjoint batches
+        without waiting on each other. Commit right after claiming.
+        """
+        next_call_after = sql_cast(CampaignDetail.attempts[-1]["next_call_after"].astext, DateTime(timezone=True))
+        campaign_is_dialable = exists().where(
+            Campaign.id == campaign_id,
+            Campaign.status == CampaignStatus.ACTIVE,
+            or_(Campaign.scheduled_at.is_(None), Campaign.scheduled_at <= func.now()),
+        )
+        callable_users = (
+            select(CampaignDetail.id)
+            .where(
+                CampaignDetail.campaign_id == campaign_id,
+                or_(
+                    CampaignDetail.status == CampaignUserStatus.PENDING,
+                    and_(
+                        CampaignDetail.status == CampaignUserStatus.RETRY,
+                        or_(next_call_after.is_(None), next_call_after <= func.now()),
+                    ),
+                ),
+                campaign_is_dialable,
+            )
+            .limit(limit)
+            .with_for_update(of=CampaignDetail, skip_locked=True)
+        )
+        stmt = (
+            update(CampaignDetail)
+            .where(CampaignDetail.id.in_(callable_users.scalar_subquery()))
+            .values(status=CampaignUserStatus.QUEUED)
+            .returning(CampaignDetail)
+            .execution_options(populate_existing=True)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def record_attempts(self, attempts: Sequence[CallAttempt]) -> None:
+        """Append call attempts and set the resulting statuses for many users at once.
+
+        Attempts are appended server-side with one `UPDATE ... FROM (VALUES ...)`,
+        and each campaign's `completed_users` is adjusted by the number of users
+        entering or leaving `COMPLETED` instead of being recounted. If a user
+        appears more than once in `attempts`, only its last entry is applied.
+        """
+        latest = {attempt["detail_id"]: attempt for attempt in attempts}
+        if not latest:
+            return
+
+        previous = await self.session.execute(
+            select(CampaignDetail.id, CampaignDetail.campaign_id, CampaignDetail.status)
+            .where(CampaignDetail.id.in_(latest))
+            .with_for_update()
+        )
+
+        completed_delta: Counter[UUID] = Counter()
+        for detail_id, campaign_id, old_status in previous:
+            was_completed = old_status == CampaignUserStatus.COMPLETED
+            is_completed = latest[detail_id]["status"] == CampaignUserStatus.COMPLETED
+            completed_delta[campaign_id] += is_completed - was_completed
+
+        patch = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("status", String),
+            column("attempt", JSONB),
+            column("called_at", DateTime(timezone=True)),
+            name="patch",
+        ).data(
+            [
+                (detail_id, attempt["status"].name, _attempt_data(attempt), attempt["called_at"])
+                for detail_id, attempt in latest.items()
+            ]
+        )
+        await self.session.execute(
+            update(CampaignDetail)
+            .where(CampaignDetail.id == patch.c.id)
+            .values(
+                {
+                    CampaignDetail.attempts: _append_attempt(patch.c.attempt),
+                    CampaignDetail.status: sql_cast(patch.c.status, CampaignDetail.status.type),
+                    CampaignDetail.last_called_at: patch.c.called_at,
+                }
+            )
+        )
+
+        deltas = {campaign_id: delta for campaign_id, delta in completed_delta.items() if delta}
+        if deltas:
+            await self.session.execute(
+                update(Campaign)
+                .where(Campaign.id.in_(deltas))
+                .values(completed_users=Campaign.completed_users + case(deltas, value=Campaign.id))
+            )
+
+
+def _append_attempt(attempt: Any) -> Any:
+    appended = sql_cast(CampaignDetail.attempts, JSONB).op("||")(func.jsonb_build_array(attempt))
+    return sql_cast(appended, CampaignDetail.attempts.type)
@@ -1,12 +1,22 @@
+from collections.abc import AsyncIterator, Sequence
 from datetime import UTC, datetime, timedelta
-from typing import cast
+from typing import TypedDict, cast
 from uuid import UUID, uuid4
 
-from sqlalchemy import select
+from sqlalchemy import insert, literal, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from echo.context.types import Channel, ContextType
-from echo.db.models.context import Context
+from echo.db.models.context import Context, JsonType
+
+
+class NewContext(TypedDict):
+    thread_id: UUID
+    opportunity_id: str | None
+    user_id: UUID
+    channel: Channel
+    content: JsonType
+    type: ContextType
 
 
 class ContextTable:
@@ -19,7 +29,7 @@ class ContextTable:
         opportunity_id: str | None,
         user_id: UUID,
         channel: Channel,
-        content: str,
+        content: JsonType,
         type: ContextType,
     ) -> UUID:
         context_id = uuid4()
@@ -36,7 +46,20 @@ class ContextTable:
         )
         return context_id
 
-    async def update_content(self, context_id: UUID, content: str) -> None:
+    async def create_contexts(self, contexts: Sequence[NewContext]) -> list[UUID]:
+        """Insert many contexts with a single multi-row `INSERT` and return their ids, in order."""
+        if not contexts:
+            return []
+
+        context_ids = [uuid4() for _ in contexts]
+        rows = [
+            {**context, "context_id": str(context_id)}
+            for context, context_id in zip(contexts, context_ids, strict=True)
+        ]
+        await self.session.execute(insert(Context).values(rows))
+        return context_ids
+
+    async def update_content(self, context_id: UUID, content: JsonType) -> None:
         result = await self.session.execute(select(Context).where(Context.context_id == str(context_id)))
         row = cast(Context | None, result.scalar_one_or_none())
 
@@ -46,13 +69,39 @@ class ContextTable:
         row.content = content
 
     async def get_context_by_id(self, context_id: UUID) -> Context | None:
-        result = await self.session.execute(select(Context).where(Context.context_id == str(context_id)))
+        result = await self.session.execute(
+            select(Context).where(Context.context_id == str(context_id)).execution_options(replica=True)
+        )
         return cast(Context | None, result.scalar_one_or_none())
 
     async def get_contexts(self) -> list[Context]:
-        result = await self.session.execute(select(Context))
+        result = await self.session.execute(select(Context).execution_options(replica=True))
+        return cast(list[Context], result.scalars().all())
+
+    async def get_contexts_page(
+        self,
+        *,
+        limit: int = 100,
+        after: tuple[datetime, str] | None = None,
+    ) -> list[Context]:
+        """Return contexts, oldest first, one keyset page at a time.
+
+        Pass the `(added_timestamp, context_id)` of the last context of a page as
+        `after` to fetch the next one.
+        """
+        stmt = select(Context).order_by(Context.added_timestamp, Context.context_id).limit(limit)
+        if after is not None:
+            stmt = stmt.where(tuple_(Context.added_timestamp, Context.context_id) > tuple_(*map(literal, after)))
+
+        result = await self.session.execute(stmt.execution_options(replica=True))
         return cast(list[Context], result.scalars().all())
 
+    async def stream_contexts(self, *, batch_size: int = 1000) -> AsyncIterator[Context]:
+        stmt = select(Context).order_by(Context.added_timestamp).execution_options(yield_per=batch_size, replica=True)
+        result = await self.session.stream_scalars(stmt)
+        async for context in result:
+            yield context
+
     async def get_context_history(
         self,
         *,
@@ -62,7 +111,19 @@ class ContextTable:
         max_age: timedelta = timedelta(days=30),
         types: list[ContextType] | None = None,
         channels: list[Channel] | None = None,
+        after: tuple[datetime, int] | None = None,
+        limit: int | None = None,
     ) -> list[Context]:
+        """Return the matching contexts, newest first, at most `limit` of them.
+
+        Contexts added in the same transaction share `added_timestamp` and are
+        ordered by `seq`, i.e. the order they were inserted in.
+
+        Lookups by `opportunity_id` walk `ix_context_opportunity_added`, whose
+        included `type` and `channel` columns let the filters run on the index
+        before any row is fetched. `after` keeps only the contexts that come
+        strictly after the `(added_timestamp, seq)` of a given context.
+        """
         if thread_id is None and user_id is None and opportunity_id is None:
             raise ValueError("get_context_history requires either thread_id, user_id or opportunity_id")
 
@@ -81,6 +142,9 @@ class ContextTable:
             stmt = stmt.where(Context.type.in_(types))
         if channels:
             stmt = stmt.where(Context.channel.in_(channels))
+        if after is not None:
+            stmt = stmt.where(tuple_(Context.added_timestamp, Context.seq) > tuple_(*map(literal, after)))
 
+        stmt = stmt.order_by(Context.added_timestamp.desc(), Context.seq.desc()).limit(limit)
         result = await self.session.execute(stmt)
         return cast(list[Context], result.scalars().all())
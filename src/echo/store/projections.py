@@ -0,0 +1,68 @@
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import Column
+
+
+@dataclass(frozen=True, slots=True)
+class CallRecordSummary:
+    insight_id: UUID
+    campaign_id: str | None
+    room_id: str | None
+    opportunity_id: str | None
+    market: str | None
+    plancode: str | None
+    answer: bool | None
+    voicemail_answer: bool | None
+    score: str | None
+    callback_requested: bool | None
+    duration_seconds: int | None
+    processed_at: datetime | None
+
+
+@dataclass(frozen=True, slots=True)
+class RoomSummary:
+    room_id: str
+    thread_id: UUID | None
+    opportunity_id: str | None
+    start_timestamp: datetime | None
+    end_timestamp: datetime | None
+    report_url: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class UserSummary:
+    opportunity_id: str
+    user_id: UUID
+    name: str | None
+    last_name: str | None
+    phone_number: str | None
+    mail: str | None
+    market: str | None
+    is_active: bool
+
+
+@dataclass(frozen=True, slots=True)
+class CampaignSummary:
+    bucket: str | date | None
+    calls: int
+    answer_rate: float
+    voicemail_rate: float
+    callback_rate: float
+    frustration_rate: float
+    hallucination_rate: float
+    avg_duration_seconds: float | None
+    score_distribution: dict[str | None, int]
+
+
+def projection_columns(model: type[Any], projection: type[Any]) -> list[Column[Any]]:
+    """Table columns of `model` matching the fields of a projection dataclass, in order."""
+    table = model.__table__
+    return [table.c[field.name] for field in fields(projection)]
+
+
+def project[T](projection: type[T], rows: Iterable[Sequence[Any]]) -> list[T]:
+    return [projection(*row) for row in rows]
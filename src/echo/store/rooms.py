@@ -1,13 +1,49 @@
+import json
+from collections.abc import AsyncIterator, Mapping
 from datetime import datetime
 from typing import Any, cast
 from uuid import UUID
 
-from sqlalchemy import select
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import (
+    BindParameter,
+    ColumnElement,
+    Select,
+    String,
+    bindparam,
+    case,
+    column,
+    func,
+    literal,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import JSONB, insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm.attributes import flag_modified
 
+from echo.db.base import get_driver_connection
 from echo.db.models.room import Room
+from echo.store.projections import RoomSummary, project, projection_columns
+
+_ROOM_UPSERT_COLUMNS = ("thread_id", "opportunity_id", "start_timestamp", "end_timestamp", "report_url", "metadata")
+
+# Built once with a fixed shape so every call reuses the same compiled SQL.
+# NULL parameters leave the stored value untouched on conflict.
+_room_params: dict[str, BindParameter[Any]] = {c: bindparam(c) for c in ("room_id", *_ROOM_UPSERT_COLUMNS)}
+# Bind None as SQL NULL rather than JSON 'null' so COALESCE can skip it.
+_room_params["metadata"] = bindparam("metadata", type_=JSONB(none_as_null=True))
+_insert_room = insert(Room).values({Room.__table__.c[c]: param for c, param in _room_params.items()})
+_UPSERT_ROOM = _insert_room.on_conflict_do_update(
+    index_elements=["room_id"],
+    set_={c: func.coalesce(_insert_room.excluded[c], Room.__table__.c[c]) for c in _ROOM_UPSERT_COLUMNS},
+)
+_UPSERT_ROOM_SQL = f"""
+    INSERT INTO rooms (room_id, {", ".join(_ROOM_UPSERT_COLUMNS)})
+    VALUES ($1, $2, $3, $4, $5, $6, $7)
+    ON CONFLICT (room_id) DO UPDATE SET
+    {", ".join(f"{c} = coalesce(EXCLUDED.{c}, rooms.{c})" for c in _ROOM_UPSERT_COLUMNS)}
+"""
 
 
 class RoomsTable:
@@ -23,37 +59,35 @@ class RoomsTable:
         end_timestamp: datetime | None,
         report_url: str | None,
         metadata: dict[str, Any] | None,
+        *,
+        prepared: bool = False,
     ) -> None:
-        update_values = {
-            k: v
-            for k, v in {
+        if prepared:
+            conn = await get_driver_connection(self.session)
+            await conn.execute(
+                _UPSERT_ROOM_SQL,
+                room_id,
+                thread_id,
+                opportunity_id,
+                start_timestamp,
+                end_timestamp,
+                report_url,
+                None if metadata is None else json.dumps(metadata),
+            )
+            return
+
+        await self.session.execute(
+            _UPSERT_ROOM,
+            {
+                "room_id": room_id,
                 "thread_id": thread_id,
                 "opportunity_id": opportunity_id,
                 "start_timestamp": start_timestamp,
                 "end_timestamp": end_timestamp,
                 "report_url": report_url,
                 "metadata": metadata,
-            }.items()
-            if v is not None
-        }
-
-        stmt = (
-            insert(Room)
-            .values(
-                room_id=room_id,
-                thread_id=thread_id,
-                opportunity_id=opportunity_id,
-                start_timestamp=start_timestamp,
-                end_timestamp=end_timestamp,
-                report_url=report_url,
-                metadata_=metadata,
-            )
-            .on_conflict_do_update(
-                index_elements=["room_id"],
-                set_=update_values,
-            )
+            },
         )
-        await self.session.execute(stmt)
 
     async def set_room_start(
         self,
@@ -62,8 +96,19 @@ class RoomsTable:
         opportunity_id: str,
         start_timestamp: datetime,
         metadata: dict[str, Any] | None = None,
+        *,
+        prepared: bool = False,
     ) -> None:
-        await self._upsert(room_id, thread_id, opportunity_id, start_timestamp, None, None, metadata)
+        """Record the start of a room, creating it if needed.
+
+        With `prepared=True` the upsert runs directly on the session's asyncpg
+        connection, whose statement cache keeps it prepared per connection and
+        skips SQLAlchemy's execution overhead. It shares the session's
+        transaction, but `Room` objects already loaded in the session are not
+        refreshed. Leave it off behind poolers that do not support prepared
+        statements.
+        """
+        await self._upsert(room_id, thread_id, opportunity_id, start_timestamp, None, None, metadata, prepared=prepared)
 
     async def set_room_end(
         self,
@@ -72,8 +117,11 @@ class RoomsTable:
         opportunity_id: str,
         end_timestamp: datetime,
         metadata: dict[str, Any] | None = None,
+        *,
+        prepared: bool = False,
     ) -> None:
-        await self._upsert(room_id, thread_id, opportunity_id, None, end_timestamp, None, metadata)
+        """Record the end of a room, creating it if needed. See `set_room_start` for `prepared`."""
+        await self._upsert(room_id, thread_id, opportunity_id, None, end_timestamp, None, metadata, prepared=prepared)
 
     async def set_room_report(
         self,
@@ -94,28 +142,126 @@ class RoomsTable:
         if opportunity_id:
             query = query.where(Room.opportunity_id == opportunity_id)
 
-        result = await self.session.execute(query)
+        result = await self.session.execute(query.execution_options(replica=True))
         return cast(Room | None, result.scalar_one_or_none())
 
     async def get_rooms(self) -> list[Room]:
-        result = await self.session.execute(select(Room).order_by(Room.start_timestamp.desc()))
+        result = await self.session.execute(
+            select(Room).order_by(Room.start_timestamp.desc()).execution_options(replica=True)
+        )
         return list(result.scalars().all())
 
+    async def get_rooms_page(
+        self,
+        *,
+        limit: int = 100,
+        after: tuple[datetime, str] | None = None,
+    ) -> list[Room]:
+        """Return started rooms, newest first, one keyset page at a time.
+
+        Pass the `(start_timestamp, room_id)` of the last room of a page as `after`
+        to fetch the next one. Rooms without a start timestamp are not included,
+        which lets the query walk `ix_rooms_start_timestamp`.
+        """
+        result = await self.session.execute(
+            self._rooms_page(select(Room), limit=limit, after=after).execution_options(replica=True)
+        )
+        return list(result.scalars().all())
+
+    async def get_room_summaries(
+        self,
+        *,
+        limit: int = 100,
+        after: tuple[datetime, str] | None = None,
+    ) -> list[RoomSummary]:
+        """Lightweight variant of `get_rooms_page` returning plain slotted dataclasses."""
+        stmt = self._rooms_page(select(*projection_columns(Room, RoomSummary)), limit=limit, after=after)
+        result = await self.session.execute(stmt.execution_options(replica=True))
+        return project(RoomSummary, result)
+
+    @staticmethod
+    def _rooms_page[S: Select[Any]](stmt: S, *, limit: int, after: tuple[datetime, str] | None) -> S:
+        stmt = (
+            stmt.where(Room.start_timestamp.is_not(None))
+            .order_by(Room.start_timestamp.desc(), Room.room_id.desc())
+            .limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(Room.start_timestamp, Room.room_id) < tuple_(*map(literal, after)))
+        return stmt
+
+    async def stream_rooms(self, *, batch_size: int = 1000) -> AsyncIterator[Room]:
+        stmt = select(Room).order_by(Room.start_timestamp.desc()).execution_options(yield_per=batch_size, replica=True)
+        result = await self.session.stream_scalars(stmt)
+        async for room in result:
+            yield room
+
+    async def append_timeline(self, room_id: str, *entries: dict[str, Any]) -> bool:
+        """Append entries to a room's timeline with a single `UPDATE ... SET timeline = timeline || ...`.
+
+        Concurrent appends serialize on the row lock instead of overwriting each
+        other. Returns False if the room does not exist.
+        """
+        if not entries:
+            return False
+
+        stmt = (
+            update(Room)
+            .where(Room.room_id == room_id)
+            .values(timeline=Room.timeline.op("||")(literal(list(entries), JSONB)))
+            .returning(Room.room_id)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none() is not None
+
     async def update_metadata(self, room_id: str, new_metadata: dict[str, Any]) -> bool:
-        room = await self.get_room(room_id)
-        if not room:
+        """Merge `new_metadata` into a room's metadata with a single `UPDATE ... SET metadata = metadata || :patch`.
+
+        Keys with falsy values are ignored. The merge runs server-side, so
+        concurrent updates to different keys do not overwrite each other. It does
+        not commit; the caller owns the transaction. Returns True if the room
+        exists and the patch was not empty.
+        """
+        patch = _metadata_patch(new_metadata)
+        if not patch:
             return False
 
-        current_metadata = dict(room.metadata_) if isinstance(room.metadata_, dict) else {}
-        updated = False
-        for k, v in new_metadata.items():
-            if v:
-                current_metadata[k] = v
-                updated = True
-
-        if updated:
-            room.metadata_ = current_metadata
-            flag_modified(room, "metadata_")
-            await self.session.commit()
-            return True
-        return False
+        stmt = (
+            update(Room)
+            .where(Room.room_id == room_id)
+            .values({Room.metadata_: _merge_metadata(literal(patch, JSONB))})
+            .returning(Room.room_id)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none() is not None
+
+    async def update_metadata_many(self, patches: Mapping[str, dict[str, Any]]) -> int:
+        """Batch variant of `update_metadata`: merge one patch per room in a single `UPDATE ... FROM (VALUES ...)`.
+
+        Returns the number of rooms updated.
+        """
+        rows = [(room_id, patch) for room_id, metadata in patches.items() if (patch := _metadata_patch(metadata))]
+        if not rows:
+            return 0
+
+        patch_values = values(column("room_id", String), column("patch", JSONB), name="patches").data(rows)
+        stmt = (
+            update(Room)
+            .where(Room.room_id == patch_values.c.room_id)
+            .values({Room.metadata_: _merge_metadata(patch_values.c.patch)})
+            .returning(Room.room_id)
+        )
+        result = await self.session.execute(stmt)
+        return len(result.all())
+
+
+def _metadata_patch(metadata: dict[str, Any]) -> dict[str, Any]:
+    return {k: v for k, v in metadata.items() if v}
+
+
+def _merge_metadata(patch: ColumnElement[Any]) -> ColumnElement[Any]:
+    current = case(
+        (func.jsonb_typeof(Room.metadata_) == "object", Room.metadata_),
+        else_=literal({}, JSONB),
+    )
+    return current.op("||")(patch)
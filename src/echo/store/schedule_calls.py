@@ -1,12 +1,23 @@
-from datetime import UTC, datetime
+from collections.abc import Sequence
+from datetime import UTC, datetime, timedelta
 from typing import Any, cast
 
-from sqlalchemy import select
+from sqlalchemy import CursorResult, bindparam, func, or_, select, tuple_, update
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from echo.db.models.scheduled_call import ScheduledCall
 
+DISPATCH_VISIBILITY_TIMEOUT = timedelta(minutes=5)
+
+_insert_schedule_call = insert(ScheduledCall).values(
+    {ScheduledCall.__table__.c[c]: bindparam(c) for c in ("opportunity_id", "scheduled_at", "metadata", "status")}
+)
+_UPSERT_SCHEDULE_CALL = _insert_schedule_call.on_conflict_do_update(
+    index_elements=["opportunity_id"],
+    set_={c: _insert_schedule_call.excluded[c] for c in ("scheduled_at", "metadata", "status")},
+)
+
 
 class ScheduleCallsTable:
     def __init__(self, session: AsyncSession) -> None:
@@ -19,24 +30,10 @@ class ScheduleCallsTable:
         metadata: dict[str, Any] | None,
         status: str = "pending",
     ) -> None:
-        stmt = (
-            insert(ScheduledCall)
-            .values(
-                opportunity_id=opportunity_id,
-                scheduled_at=scheduled_at,
-                metadata_=metadata,
-                status=status,
-            )
-            .on_conflict_do_update(
-                index_elements=["opportunity_id"],
-                set_={
-                    "scheduled_at": scheduled_at,
-                    "metadata": metadata,
-                    "status": status,
-                },
-            )
+        await self.session.execute(
+            _UPSERT_SCHEDULE_CALL,
+            {"opportunity_id": opportunity_id, "scheduled_at": scheduled_at, "metadata": metadata, "status": status},
         )
-        await self.session.execute(stmt)
 
     async def get_ready_calls(self) -> list[ScheduledCall]:
         stmt = select(ScheduledCall).where(
@@ -46,9 +43,79 @@ class ScheduleCallsTable:
         result = await self.session.execute(stmt)
         return cast(list[ScheduledCall], result.scalars().all())
 
+    async def claim_due(
+        self,
+        limit: int = 100,
+        *,
+        visibility_timeout: timedelta = DISPATCH_VISIBILITY_TIMEOUT,
+    ) -> list[ScheduledCall]:
+        """Atomically claim up to `limit` due calls by moving them to `dispatching`.
+
+        Rows are selected with `FOR UPDATE SKIP LOCKED`, so concurrent
+        dispatchers get disjoint batches instead of blocking on or re-sending
+        each other's rows. Calls left in `dispatching` for longer than
+        `visibility_timeout` (a dispatcher crashed before finishing them) are
+        claimed again. Commit right after claiming so other dispatchers see it,
+        and hand the returned rows to `release` or `mark_finished_many`.
+        """
+        due = (
+            select(ScheduledCall.opportunity_id)
+            .where(
+                ScheduledCall.status.in_(["pending", "dispatching"]),
+                ScheduledCall.scheduled_at <= func.now(),
+                or_(
+                    ScheduledCall.status == "pending",
+                    ScheduledCall.updated_timestamp < func.now() - visibility_timeout,
+                ),
+            )
+            .order_by(ScheduledCall.scheduled_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(ScheduledCall)
+            .where(ScheduledCall.opportunity_id.in_(due.scalar_subquery()))
+            .values(status="dispatching", updated_timestamp=func.now())
+            .returning(ScheduledCall)
+            .execution_options(populate_existing=True)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def release(self, claimed: Sequence[ScheduledCall]) -> int:
+        """Return claimed calls to `pending`, e.g. after a failed publish."""
+        return await self._settle(claimed, "pending")
+
     async def mark_finished(self, opportunity_id: str) -> None:
         result = await self.session.execute(select(ScheduledCall).where(ScheduledCall.opportunity_id == opportunity_id))
         row = cast(ScheduledCall | None, result.scalar_one_or_none())
         if row is None:
             raise ValueError(f"ScheduleCall {opportunity_id} not found")
         row.status = "finished"
+
+    async def mark_finished_many(self, claimed: Sequence[ScheduledCall]) -> int:
+        return await self._settle(claimed, "finished")
+
+    async def _settle(self, claimed: Sequence[ScheduledCall], status: str) -> int:
+        """Move calls claimed by `claim_due` out of `dispatching`.
+
+        Only rows still holding the caller's claim, i.e. in `dispatching` with
+        the `updated_timestamp` set when they were claimed, are updated: a call
+        another dispatcher re-claimed after the visibility timeout, or that was
+        rescheduled meanwhile, is left alone. Returns the number of calls
+        updated; fewer than `len(claimed)` means some claims were lost.
+        """
+        if not claimed:
+            return 0
+        result = await self.session.execute(
+            update(ScheduledCall)
+            .where(
+                ScheduledCall.status == "dispatching",
+                tuple_(ScheduledCall.opportunity_id, ScheduledCall.updated_timestamp).in_(
+                    [(call.opportunity_id, call.updated_timestamp) for call in claimed]
+                ),
+            )
+            .values(status=status, updated_timestamp=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        return cast(CursorResult[Any], result).rowcount
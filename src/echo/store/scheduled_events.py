@@ -0,0 +1,94 @@
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from typing import Any, cast
+from uuid import UUID
+
+from sqlalchemy import CursorResult, func, insert, or_, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import echo.events.v1 as events
+from echo.db.models.scheduled_events import ScheduledEvent
+from echo.store.schedule_calls import DISPATCH_VISIBILITY_TIMEOUT
+
+
+class ScheduledEventsTable:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def schedule(
+        self,
+        event: events.BaseEvent,
+        scheduled_at: datetime,
+        metadata: dict[str, Any] | None = None,
+    ) -> UUID:
+        stmt = (
+            insert(ScheduledEvent)
+            .values(
+                scheduled_at=scheduled_at,
+                payload=event.model_dump(mode="json"),
+                metadata_=metadata,
+                status="pending",
+            )
+            .returning(ScheduledEvent.id)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one()
+
+    async def claim_due(
+        self,
+        limit: int = 100,
+        *,
+        visibility_timeout: timedelta = DISPATCH_VISIBILITY_TIMEOUT,
+    ) -> list[ScheduledEvent]:
+        """Atomically claim up to `limit` due events by moving them to `dispatching`.
+
+        Same contract as `ScheduleCallsTable.claim_due`. The lookup walks the
+        `ix_scheduled_events_dispatch` partial index.
+        """
+        due = (
+            select(ScheduledEvent.id)
+            .where(
+                ScheduledEvent.status.in_(["pending", "dispatching"]),
+                ScheduledEvent.scheduled_at <= func.now(),
+                or_(
+                    ScheduledEvent.status == "pending",
+                    ScheduledEvent.updated_timestamp < func.now() - visibility_timeout,
+                ),
+            )
+            .order_by(ScheduledEvent.scheduled_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(ScheduledEvent)
+            .where(ScheduledEvent.id.in_(due.scalar_subquery()))
+            .values(status="dispatching", updated_timestamp=func.now())
+            .returning(ScheduledEvent)
+            .execution_options(populate_existing=True)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def release(self, claimed: Sequence[ScheduledEvent]) -> int:
+        """Return claimed events to `pending`, e.g. after a failed publish."""
+        return await self._settle(claimed, "pending")
+
+    async def mark_dispatched(self, claimed: Sequence[ScheduledEvent]) -> int:
+        return await self._settle(claimed, "dispatched")
+
+    async def _settle(self, claimed: Sequence[ScheduledEvent], status: str) -> int:
+        """Move claimed events out of `dispatching`, leaving lost claims alone (see `ScheduleCallsTable._settle`)."""
+        if not claimed:
+            return 0
+        result = await self.session.execute(
+            update(ScheduledEvent)
+            .where(
+                ScheduledEvent.status == "dispatching",
+                tuple_(ScheduledEvent.id, ScheduledEvent.updated_timestamp).in_(
+                    [(event.id, event.updated_timestamp) for event in claimed]
+                ),
+            )
+            .values(status=status, updated_timestamp=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        return cast(CursorResult[Any], result).rowcount
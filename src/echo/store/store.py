@@ -4,12 +4,14 @@ from typing import Protocol, Self
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from echo.db.base import get_sessionmaker
+from echo.db.base import get_read_sessionmaker, get_routing_sessionmaker, get_sessionmaker
 from echo.store.adversary import AdversaryTable
 from echo.store.analytics import AnalyticsTable
+from echo.store.campaigns import CampaignsTable
 from echo.store.context import ContextTable
 from echo.store.rooms import RoomsTable
 from echo.store.schedule_calls import ScheduleCallsTable
+from echo.store.scheduled_events import ScheduledEventsTable
 from echo.store.users import UsersTable
 
 
@@ -19,7 +21,9 @@ class Store(Protocol):
     context: ContextTable
     analytics: AnalyticsTable
     schedule_calls: ScheduleCallsTable
+    scheduled_events: ScheduledEventsTable
     adversary: AdversaryTable
+    campaigns: CampaignsTable
 
 
 class PostgresStore:
@@ -30,16 +34,36 @@ class PostgresStore:
         self.context = ContextTable(session)
         self.analytics = AnalyticsTable(session)
         self.schedule_calls = ScheduleCallsTable(session)
+        self.scheduled_events = ScheduledEventsTable(session)
         self.adversary = AdversaryTable(session)
+        self.campaigns = CampaignsTable(session)
 
     @classmethod
     @asynccontextmanager
-    async def open(cls) -> AsyncGenerator[Self, None]:
-        session = get_sessionmaker()()
+    async def open(cls, *, readonly: bool = False, read_your_writes: bool = False) -> AsyncGenerator[Self, None]:
+        """Open a store on a new session, committed on success and rolled back on error.
+
+        When a read replica is configured (`POSTGRES_READ_HOST`), the tables' read
+        methods go to it until the transaction first writes; `read_your_writes=True` keeps the
+        whole session on the primary instead, for reads that must see writes
+        committed by other sessions moments ago. `readonly=True` binds the
+        session to the replica only and never commits.
+        """
+        if readonly:
+            sessionmaker = get_read_sessionmaker()
+        elif read_your_writes:
+            sessionmaker = get_sessionmaker()
+        else:
+            sessionmaker = get_routing_sessionmaker()
+
+        session = sessionmaker()
         store = cls(session)
         try:
             yield store
-            await session.commit()
+            if readonly:
+                await session.rollback()
+            else:
+                await session.commit()
         except:
             await session.rollback()
             raise
@@ -1,17 +1,115 @@
-from typing import cast
-from uuid import UUID
+import asyncio
+import json
+import os
+from collections.abc import AsyncIterator, Iterable, Mapping
+from datetime import datetime
+from typing import Any, cast
+from uuid import UUID, uuid4
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, column, event, func, select, table, text
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction, make_transient_to_detached
 
+from echo.db.base import get_driver_connection
 from echo.db.models.user import User
+from echo.store.projections import UserSummary, project, projection_columns
+from echo.utils.cache import TieredCache
+
+BULK_USER_COLUMNS = (
+    "user_id",
+    "contact_id",
+    "opportunity_id",
+    "name",
+    "last_name",
+    "phone_number",
+    "mail",
+    "market",
+    "faculty",
+    "plancode",
+    "track",
+)
+
+_insert_user = insert(User).values({c: bindparam(c) for c in BULK_USER_COLUMNS})
+_UPSERT_USER = _insert_user.on_conflict_do_update(
+    index_elements=["opportunity_id"],
+    set_={c: _insert_user.excluded[c] for c in BULK_USER_COLUMNS if c != "user_id"},
+)
+
+_user_cache: TieredCache | None = None
+
+
+def get_user_cache() -> TieredCache:
+    """Process-wide cache of users by `opportunity_id`.
+
+    Entries live `USER_CACHE_TTL_SECONDS` (default 30). With
+    `USER_CACHE_REDIS=true` they are also shared through Redis.
+    """
+    global _user_cache
+    if _user_cache is None:
+        redis = None
+        if os.getenv("USER_CACHE_REDIS", "false").lower() == "true":
+            from echo.utils.redis import RedisClient
+
+            redis = RedisClient.get()
+        ttl = float(os.getenv("USER_CACHE_TTL_SECONDS") or 30)
+        _user_cache = TieredCache("echo:users", ttl, redis=redis)
+    return _user_cache
+
+
+def _dump_user(user: User) -> str:
+    return json.dumps({c.key: getattr(user, c.key) for c in User.__table__.columns}, default=str)
+
+
+def _load_user(raw: str) -> User:
+    data = json.loads(raw)
+    data["user_id"] = UUID(data["user_id"])
+    for key in ("added_timestamp", "updated_timestamp"):
+        if data[key] is not None:
+            data[key] = datetime.fromisoformat(data[key])
+    user = User(**data)
+    make_transient_to_detached(user)
+    return user
+
+
+_PENDING_INVALIDATIONS_KEY = "echo.user_cache.pending_invalidations"
+_invalidations: set[asyncio.Task[None]] = set()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_user_cache(session: Session) -> None:
+    keys = session.info.pop(_PENDING_INVALIDATIONS_KEY, None)
+    if not keys:
+        return
+    cache = get_user_cache()
+    # Drop the in-process entries right away so the committing task cannot read
+    # them back; the shared tier is cleared in the background.
+    cache.memory.delete(*keys)
+    task = asyncio.get_running_loop().create_task(cache.delete(keys))
+    _invalidations.add(task)
+    task.add_done_callback(_invalidations.discard)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_user_cache_invalidations(session: Session, transaction: SessionTransaction) -> None:
+    # Runs after `after_commit`, so whatever is left belongs to a rolled back transaction.
+    if transaction.parent is None:
+        session.info.pop(_PENDING_INVALIDATIONS_KEY, None)
 
 
 class UsersTable:
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
 
+    def _invalidate_after_commit(self, opportunity_ids: Iterable[str]) -> None:
+        """Evict users from the user cache once the transaction commits.
+
+        Evicting earlier would let a concurrent `get_user_cached` reload the
+        uncommitted row's previous version and keep it for the whole TTL; a
+        rollback evicts nothing.
+        """
+        self.session.sync_session.info.setdefault(_PENDING_INVALIDATIONS_KEY, set()).update(opportunity_ids)
+
     async def upsert_user(
         self,
         user_id: UUID,
@@ -26,38 +124,72 @@ class UsersTable:
         plancode: str | None = None,
         track: str | None = None,
     ) -> None:
-        stmt = (
-            insert(User)
-            .values(
-                user_id=user_id,
-                contact_id=contact_id,
-                opportunity_id=opportunity_id,
-                name=name,
-                last_name=last_name,
-                phone_number=phone_number,
-                mail=mail,
-                market=market,
-                faculty=faculty,
-                plancode=plancode,
-                track=track,
+        await self.session.execute(
+            _UPSERT_USER,
+            {
+                "user_id": user_id,
+                "contact_id": contact_id,
+                "opportunity_id": opportunity_id,
+                "name": name,
+                "last_name": last_name,
+                "phone_number": phone_number,
+                "mail": mail,
+                "market": market,
+                "faculty": faculty,
+                "plancode": plancode,
+                "track": track,
+            },
+        )
+        if opportunity_id is not None:
+            self._invalidate_after_commit([opportunity_id])
+
+    async def bulk_upsert_users(self, users: Iterable[Mapping[str, Any]]) -> int:
+        """Upsert many users in a single round trip per phase.
+
+        Rows are streamed into a temporary staging table with binary `COPY` and
+        merged into `users` with one `INSERT ... ON CONFLICT`. Each mapping uses
+        the keyword names of `upsert_user`; missing keys are stored as NULL and a
+        missing `user_id` is generated. When an opportunity appears more than once
+        the last row wins, as with sequential `upsert_user` calls. Rows without an
+        `opportunity_id` are ignored. Returns the number of rows merged.
+        """
+        staging_name = f"_users_staging_{uuid4().hex}"
+        await self.session.execute(
+            text(
+                f"CREATE TEMP TABLE {staging_name} ("
+                "row_no bigserial, user_id uuid, contact_id text, opportunity_id text, name text, "
+                "last_name text, phone_number text, mail text, market text, faculty text, plancode text, track text"
+                ") ON COMMIT DROP"
             )
-            .on_conflict_do_update(
-                index_elements=["opportunity_id"],
-                set_={
-                    "contact_id": contact_id,
-                    "opportunity_id": opportunity_id,
-                    "name": name,
-                    "last_name": last_name,
-                    "phone_number": phone_number,
-                    "mail": mail,
-                    "market": market,
-                    "faculty": faculty,
-                    "plancode": plancode,
-                    "track": track,
-                },
+        )
+
+        conn = await get_driver_connection(self.session)
+        await conn.copy_records_to_table(
+            staging_name,
+            records=(tuple(user.get(c) for c in BULK_USER_COLUMNS) for user in users),
+            columns=BULK_USER_COLUMNS,
+        )
+
+        staging = table(staging_name, column("row_no"), *(column(c) for c in BULK_USER_COLUMNS))
+        latest = (
+            select(
+                func.coalesce(staging.c.user_id, func.gen_random_uuid()),
+                *(staging.c[c] for c in BULK_USER_COLUMNS[1:]),
             )
+            .distinct(staging.c.opportunity_id)
+            .where(staging.c.opportunity_id.is_not(None))
+            .order_by(staging.c.opportunity_id, staging.c.row_no.desc())
+        )
+        stmt = insert(User).from_select(list(BULK_USER_COLUMNS), latest)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["opportunity_id"],
+            set_={c: stmt.excluded[c] for c in BULK_USER_COLUMNS if c != "user_id"},
         )
-        await self.session.execute(stmt)
+        result = await self.session.execute(stmt.returning(User.opportunity_id))
+        merged = list(result.scalars())
+        await self.session.execute(text(f"DROP TABLE {staging_name}"))
+        self._invalidate_after_commit(merged)
+        return len(merged)
 
     async def soft_delete_user(self, user_id: UUID) -> None:
         result = await self.session.execute(select(User).where(User.user_id == user_id))
@@ -65,11 +197,18 @@ class UsersTable:
         if user is None:
             raise ValueError(f"User {user_id} not found")
         user.is_active = False
+        self._invalidate_after_commit([user.opportunity_id])
 
     async def get_users(self) -> list[User]:
-        result = await self.session.execute(select(User))
+        result = await self.session.execute(select(User).execution_options(replica=True))
         return cast(list[User], result.scalars().all())
 
+    async def stream_users(self, *, batch_size: int = 1000) -> AsyncIterator[User]:
+        stmt = select(User).order_by(User.opportunity_id).execution_options(yield_per=batch_size, replica=True)
+        result = await self.session.stream_scalars(stmt)
+        async for user in result:
+            yield user
+
     async def get_user(
         self,
         *,
@@ -88,9 +227,39 @@ class UsersTable:
         else:
             stmt = stmt.where(User.opportunity_id == opportunity_id)
 
-        result = await self.session.execute(stmt)
+        result = await self.session.execute(stmt.execution_options(replica=True))
         return cast(User | None, result.scalar_one_or_none())
 
+    async def get_user_cached(self, opportunity_id: str) -> User | None:
+        """`get_user` by `opportunity_id` through the user cache (see `get_user_cache`).
+
+        Cache hits are attached to the session with `merge(load=False)`, without
+        a query. Writes through this table invalidate the entry, but other
+        processes may serve the previous version until it expires.
+        """
+        cache = get_user_cache()
+        raw = await cache.get(opportunity_id)
+        if raw is not None:
+            return await self.session.merge(_load_user(raw), load=False)
+
+        # Read from the primary: a lagging replica row would be cached for the whole TTL.
+        result = await self.session.execute(select(User).where(User.opportunity_id == opportunity_id))
+        user = result.scalar_one_or_none()
+        if user is not None:
+            await cache.set(opportunity_id, _dump_user(user))
+        return user
+
+    async def get_users_by_opportunity_ids(self, opportunity_ids: Iterable[str]) -> dict[str, User]:
+        """Load many users in one query, keyed by `opportunity_id`, and warm the user cache with them."""
+        ids = set(opportunity_ids)
+        if not ids:
+            return {}
+
+        result = await self.session.execute(select(User).where(User.opportunity_id.in_(ids)))
+        users = {user.opportunity_id: user for user in result.scalars()}
+        await get_user_cache().set_many({opportunity_id: _dump_user(user) for opportunity_id, user in users.items()})
+        return users
+
     async def query_users(
         self,
         user_id: UUID | None = None,
@@ -101,7 +270,14 @@ class UsersTable:
         is_active: bool | None = None,
         limit: int | None = None,
         offset: int | None = None,
+        after_opportunity_id: str | None = None,
     ) -> list[User]:
+        """Filter users, optionally paginated.
+
+        Prefer keyset pagination over `offset`: pass the `opportunity_id` of the
+        last user of a page as `after_opportunity_id` to fetch the next one.
+        Paginated results are ordered by `opportunity_id`.
+        """
         stmt = select(User)
 
         if user_id is not None:
@@ -116,10 +292,38 @@ class UsersTable:
             stmt = stmt.where(User.faculty == faculty)
         if is_active is not None:
             stmt = stmt.where(User.is_active == is_active)
+        if after_opportunity_id is not None:
+            stmt = stmt.where(User.opportunity_id > after_opportunity_id)
+        if limit is not None or offset is not None or after_opportunity_id is not None:
+            stmt = stmt.order_by(User.opportunity_id)
         if limit is not None:
             stmt = stmt.limit(limit)
         if offset is not None:
             stmt = stmt.offset(offset)
 
-        result = await self.session.execute(stmt)
+        result = await self.session.execute(stmt.execution_options(replica=True))
         return cast(list[User], result.scalars().all())
+
+    async def get_user_summaries(
+        self,
+        *,
+        market: str | None = None,
+        is_active: bool | None = None,
+        limit: int = 100,
+        after_opportunity_id: str | None = None,
+    ) -> list[UserSummary]:
+        """Keyset-paginated user listing returning plain slotted dataclasses.
+
+        Selects only the summary columns, skipping ORM hydration and the
+        session's identity map.
+        """
+        stmt = select(*projection_columns(User, UserSummary)).order_by(User.opportunity_id).limit(limit)
+        if market is not None:
+            stmt = stmt.where(User.market == market)
+        if is_active is not None:
+            stmt = stmt.where(User.is_active == is_active)
+        if after_opportunity_id is not None:
+            stmt = stmt.where(User.opportunity_id > after_opportunity_id)
+
+        result = await self.session.execute(stmt.execution_options(replica=True))
+        return project(UserSummary, result)
@@ -0,0 +1,147 @@
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Mapping
+from typing import TYPE_CHECKING
+
+from echo.logger import get_logger
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+log = get_logger(__name__)
+
+
+class TTLCache[V]:
+    """In-process cache whose entries expire `ttl` seconds after being set.
+
+    Holds at most `maxsize` entries, evicting the least recently set first.
+    """
+
+    def __init__(self, ttl: float, *, maxsize: int = 10_000) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: str) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        return value
+
+    def set(self, key: str, value: V) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class TieredCache:
+    """String cache with an in-process tier and an optional shared Redis tier.
+
+    Reads check memory first, then Redis, and fill memory from Redis hits.
+    Redis keys are prefixed with `namespace` and expire after `ttl` as well.
+    Redis errors are logged and treated as misses, so an unavailable Redis
+    only costs cache hits.
+    """
+
+    def __init__(self, namespace: str, ttl: float, *, redis: "Redis | None" = None, maxsize: int = 10_000) -> None:
+        self.namespace = namespace
+        self.ttl = ttl
+        self.redis = redis
+        self.memory: TTLCache[str] = TTLCache(ttl, maxsize=maxsize)
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get(self, key: str) -> str | None:
+        value = self.memory.get(key)
+        if value is not None or self.redis is None:
+            return value
+
+        from redis.exceptions import RedisError
+
+        try:
+            raw = await self.redis.get(self._key(key))
+        except RedisError:
+            log.warning("Cache read from Redis failed for %s", self._key(key), exc_info=True)
+            return None
+        if raw is None:
+            return None
+
+        value = _decode(raw)
+        self.memory.set(key, value)
+        return value
+
+    async def get_many(self, keys: Iterable[str]) -> dict[str, str]:
+        """Look up many keys at once, reading the ones missing from memory with a single MGET."""
+        found: dict[str, str] = {}
+        missing: list[str] = []
+        for key in keys:
+            if (value := self.memory.get(key)) is not None:
+                found[key] = value
+            else:
+                missing.append(key)
+        if self.redis is None or not missing:
+            return found
+
+        from redis.exceptions import RedisError
+
+        from echo.utils.redis import get_many
+
+        try:
+            raws = await get_many([self._key(key) for key in missing], redis=self.redis)
+        except RedisError:
+            log.warning("Cache read from Redis failed for %s", self.namespace, exc_info=True)
+            return found
+
+        for key, raw in zip(missing, raws, strict=True):
+            if raw is not None:
+                found[key] = _decode(raw)
+                self.memory.set(key, found[key])
+        return found
+
+    async def set(self, key: str, value: str) -> None:
+        await self.set_many({key: value})
+
+    async def set_many(self, items: Mapping[str, str]) -> None:
+        for key, value in items.items():
+            self.memory.set(key, value)
+        if self.redis is None or not items:
+            return
+
+        from redis.exceptions import RedisError
+
+        from echo.utils.redis import set_many
+
+        try:
+            await set_many({self._key(key): value for key, value in items.items()}, ttl=self.ttl, redis=self.redis)
+        except RedisError:
+            log.warning("Cache write to Redis failed for %s", self.namespace, exc_info=True)
+
+    async def delete(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        self.memory.delete(*keys)
+        if self.redis is None or not keys:
+            return
+
+        from redis.exceptions import RedisError
+
+        try:
+            await self.redis.delete(*(self._key(key) for key in keys))
+        except RedisError:
+            log.warning("Cache invalidation in Redis failed for %s", self.namespace, exc_info=True)
+
+
+def _decode(raw: object) -> str:
+    return raw.decode() if isinstance(raw, bytes) else str(raw)
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+from collections.abc import Sequence
+from typing import Any
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration
+
+from echo.utils.cache import TieredCache
+
+DEFAULT_LLM_CACHE_TTL = 7 * 86400
+
+
+class LLMCache(BaseCache):
+    """LangChain response cache keyed by a hash of (model parameters, prompt).
+
+    LangChain passes the fully rendered prompt and an `llm_string` describing
+    the model (deployment, temperature, ...), so identical inputs to the same
+    chain and model hit the cache whatever code path produced them. Async calls
+    use both tiers of `cache`; sync calls only the in-process one. Only chat
+    generations are cached.
+    """
+
+    def __init__(self, cache: TieredCache) -> None:
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode()).hexdigest()
+
+    def _count(self, raw: str | None) -> RETURN_VAL_TYPE | None:
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _loads(raw)
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        return self._count(self.cache.memory.get(self._key(prompt, llm_string)))
+
+    async def alookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        return self._count(await self.cache.get(self._key(prompt, llm_string)))
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if (raw := _dumps(return_val)) is not None:
+            self.cache.memory.set(self._key(prompt, llm_string), raw)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if (raw := _dumps(return_val)) is not None:
+            await self.cache.set(self._key(prompt, llm_string), raw)
+
+    def clear(self, **kwargs: Any) -> None:
+        """Clear the in-process tier; Redis entries expire on their own."""
+        self.cache.memory.clear()
+
+
+def _dumps(generations: Sequence[Any]) -> str | None:
+    if not all(isinstance(generation, ChatGeneration) for generation in generations):
+        return None
+    return json.dumps(
+        [
+            {"message": message_to_dict(generation.message), "generation_info": generation.generation_info}
+            for generation in generations
+        ]
+    )
+
+
+def _loads(raw: str) -> RETURN_VAL_TYPE:
+    entries = json.loads(raw)
+    messages = messages_from_dict([entry["message"] for entry in entries])
+    return [
+        ChatGeneration(message=message, generation_info=entry["generation_info"])
+        for message, entry in zip(messages, entries, strict=True)
+    ]
+
+
+_llm_cache: LLMCache | None = None
+
+
+def get_llm_cache() -> LLMCache | None:
+    """Process-wide LLM response cache, or None when disabled.
+
+    Enabled with `LLM_CACHE=memory` (in-process only) or `LLM_CACHE=redis`
+    (also shared through Redis). Entries live `LLM_CACHE_TTL_SECONDS`
+    (default 7 days).
+    """
+    global _llm_cache
+    mode = os.getenv("LLM_CACHE", "").lower()
+    if mode not in ("memory", "redis"):
+        return None
+
+    if _llm_cache is None:
+        redis = None
+        if mode == "redis":
+            from echo.utils.redis import RedisClient
+
+            redis = RedisClient.get()
+        ttl = float(os.getenv("LLM_CACHE_TTL_SECONDS") or DEFAULT_LLM_CACHE_TTL)
+        _llm_cache = LLMCache(TieredCache("echo:llm", ttl, redis=redis))
+    return _llm_cache
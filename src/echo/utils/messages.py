@@ -1,49 +1,199 @@
-from collections.abc import Iterable
-from typing import Any, cast
+import asyncio
+from collections.abc import Iterator, Sequence
+from typing import Any, Literal, cast
 
-from langchain_core.messages import (
-    AIMessage,
-    BaseMessage,
-    HumanMessage,
-    MessageLikeRepresentation,
-    convert_to_messages,
-    convert_to_openai_messages as langchain_messages_to_chat,
-)
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
 
-from echo.context.chain import build_chain
-from echo.context.types import Chat
+from echo.context.chain import build_chain, build_merge_chain, build_update_chain
+from echo.context.types import Chat, ChatMessage
 
+SUMMARY_TOKEN_BUDGET = 6000
+"""Largest input, in estimated tokens, sent to the model by a single summarization call."""
 
-def livekit_report_to_chat(report: dict[str, Any]) -> Chat:
-    events = report.get("events", [])
+CHARS_PER_TOKEN = 4
 
-    messages: list[HumanMessage | AIMessage] = []
 
-    for event in events:
+def _report_turns(report: dict[str, Any]) -> Iterator[tuple[Literal["user", "assistant"], str]]:
+    for event in report.get("events", []):
         event_type = event.get("type")
 
-        if event_type == "user_input_transcribed" and event.get("is_final"):
-            text = event.get("transcript", "").strip()
-            if text:
-                messages.append(HumanMessage(text))
+        if event_type == "user_input_transcribed":
+            if event.get("is_final") and (text := event.get("transcript", "").strip()):
+                yield "user", text
 
-        if event_type == "conversation_item_added":
+        elif event_type == "conversation_item_added":
             item = event.get("item", {})
             if item.get("type") == "message" and item.get("role") == "assistant":
-                parts = item.get("content", [])
-                text = " ".join(parts).strip()
-                if text:
-                    messages.append(AIMessage(text))
+                if text := " ".join(item.get("content", [])).strip():
+                    yield "assistant", text
+
+
+def livekit_report_to_chat(report: dict[str, Any]) -> Chat:
+    """Extract the final user transcripts and assistant messages of a LiveKit session report, in order."""
+    return [ChatMessage(role=role, content=text) for role, text in _report_turns(report)]
+
+
+def livekit_report_to_messages(report: dict[str, Any]) -> list[BaseMessage]:
+    """Convert a LiveKit session report to LangChain messages, like `livekit_report_to_chat`."""
+    return [HumanMessage(text) if role == "user" else AIMessage(text) for role, text in _report_turns(report)]
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap, tokenizer-free estimate of the tokens in `text`, good enough for budgeting."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def chunk_chat(chat: Chat, token_budget: int) -> list[Chat]:
+    """Split `chat` into consecutive chunks that each fit in `token_budget`.
 
-    return cast(Chat, langchain_messages_to_chat(messages))
+    Empty messages are dropped and a single message longer than the budget is
+    truncated to it.
+    """
+    max_chars = token_budget * CHARS_PER_TOKEN
+    chunks: list[Chat] = []
+    chunk: Chat = []
+    used = 0
+    for message in chat:
+        if not message["content"]:
+            continue
 
+        if len(message["content"]) > max_chars:
+            message = ChatMessage(role=message["role"], content=message["content"][:max_chars])
+        tokens = estimate_tokens(f"{message['role']}: {message['content']}\n")
+        if chunk and used + tokens > token_budget:
+            chunks.append(chunk)
+            chunk, used = [], 0
+        chunk.append(message)
+        used += tokens
 
-def livekit_report_to_messages(report: dict[str, Any]) -> Iterable[BaseMessage]:
-    chat = cast(Iterable[MessageLikeRepresentation], livekit_report_to_chat(report))
-    return cast(Iterable[BaseMessage], convert_to_messages(chat))
+    if chunk:
+        chunks.append(chunk)
+    return chunks
 
 
-def build_summary(chat: Chat) -> str:
+def build_summary(chat: Chat, *, token_budget: int = SUMMARY_TOKEN_BUDGET) -> str:
+    """Summarize `chat`, map-reducing it when it does not fit in `token_budget`.
+
+    Long chats are split with `chunk_chat`, each chunk is summarized (in one
+    batch) and the partial summaries are merged, in as many rounds as needed
+    to keep every call within the budget.
+    """
+    chunks = chunk_chat(chat, token_budget)
+    chain = build_chain()
+    if len(chunks) <= 1:
+        return cast(str, chain.invoke({"chat": chunks[0] if chunks else chat}))
+
+    summaries = chain.batch([{"chat": chunk} for chunk in chunks])
+    return _merge_summaries(summaries, token_budget)
+
+
+async def abuild_summary(
+    chat: Chat,
+    *,
+    token_budget: int = SUMMARY_TOKEN_BUDGET,
+    max_concurrency: int | None = None,
+) -> str:
+    """Async `build_summary`; `max_concurrency` bounds the parallel calls of the map-reduce path."""
+    config = RunnableConfig(max_concurrency=max_concurrency)
+    chunks = chunk_chat(chat, token_budget)
     chain = build_chain()
-    summary = chain.invoke({"chat": chat})
-    return cast(str, summary)
+    if len(chunks) <= 1:
+        return await chain.ainvoke({"chat": chunks[0] if chunks else chat})
+
+    summaries = await chain.abatch([{"chat": chunk} for chunk in chunks], config)
+    return await _amerge_summaries(summaries, token_budget, config)
+
+
+async def build_summaries(
+    chats: Sequence[Chat],
+    *,
+    max_concurrency: int = 8,
+    token_budget: int = SUMMARY_TOKEN_BUDGET,
+) -> list[str]:
+    """Summarize many chats concurrently, returning the summaries in order.
+
+    At most `max_concurrency` model calls are in flight at any time, including
+    the chunk and merge calls of chats that need map-reduce.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def summarize(chat: Chat) -> str:
+        async with semaphore:
+            return await abuild_summary(chat, token_budget=token_budget, max_concurrency=1)
+
+    return list(await asyncio.gather(*(summarize(chat) for chat in chats)))
+
+
+def update_summary(previous: str | None, chat: Chat, *, token_budget: int = SUMMARY_TOKEN_BUDGET) -> str:
+    """Fold the new messages in `chat` into the `previous` summary of the conversation.
+
+    Only `chat` and the previous summary are sent to the model, so the cost
+    grows with the new content rather than with the whole history. New content
+    that does not fit in the budget alongside the previous summary is
+    summarized on its own first and then merged into it.
+    """
+    if not previous:
+        return build_summary(chat, token_budget=token_budget)
+
+    chunks = chunk_chat(chat, token_budget)
+    if not chunks:
+        return previous
+
+    if _fits_update(previous, chunks, token_budget):
+        return build_update_chain().invoke({"summary": previous, "chat": chunks[0]})
+
+    return _merge_summaries([previous, build_summary(chat, token_budget=token_budget)], token_budget)
+
+
+async def aupdate_summary(previous: str | None, chat: Chat, *, token_budget: int = SUMMARY_TOKEN_BUDGET) -> str:
+    """Async `update_summary`."""
+    if not previous:
+        return await abuild_summary(chat, token_budget=token_budget)
+
+    chunks = chunk_chat(chat, token_budget)
+    if not chunks:
+        return previous
+
+    if _fits_update(previous, chunks, token_budget):
+        return await build_update_chain().ainvoke({"summary": previous, "chat": chunks[0]})
+
+    new_summary = await abuild_summary(chat, token_budget=token_budget)
+    return await _amerge_summaries([previous, new_summary], token_budget)
+
+
+def _fits_update(previous: str, chunks: list[Chat], token_budget: int) -> bool:
+    new_tokens = sum(estimate_tokens(message["content"]) for message in chunks[0])
+    return len(chunks) == 1 and estimate_tokens(previous) + new_tokens <= token_budget
+
+
+def _merge_summaries(summaries: list[str], token_budget: int) -> str:
+    chain = build_merge_chain()
+    while len(summaries) > 1:
+        groups = _group_summaries(summaries, token_budget)
+        summaries = chain.batch([{"summaries": group} for group in groups])
+    return summaries[0]
+
+
+async def _amerge_summaries(summaries: list[str], token_budget: int, config: RunnableConfig | None = None) -> str:
+    chain = build_merge_chain()
+    while len(summaries) > 1:
+        groups = _group_summaries(summaries, token_budget)
+        summaries = await chain.abatch([{"summaries": group} for group in groups], config)
+    return summaries[0]
+
+
+def _group_summaries(summaries: list[str], token_budget: int) -> list[list[str]]:
+    groups: list[list[str]] = [[]]
+    used = 0
+    for summary in summaries:
+        tokens = estimate_tokens(summary)
+        # Every group takes at least two summaries so each round shrinks the list.
+        if len(groups[-1]) >= 2 and used + tokens > token_budget:
+            groups.append([])
+            used = 0
+        groups[-1].append(summary)
+        used += tokens
+    if len(groups) > 1 and len(groups[-1]) == 1:
+        groups[-2].extend(groups.pop())
+    return groups
@@ -1,13 +1,19 @@
+import asyncio
+import functools
 import os
+from collections.abc import Callable
 
 from langchain_openai import (
     AzureChatOpenAI,
     ChatOpenAI,
 )
+from openai import DefaultAsyncHttpxClient
 from pydantic import SecretStr
 
 from echo import config as cfg
 from echo.logger import get_logger
+from echo.utils.llm_cache import get_llm_cache
+from echo.utils.rate_limit import get_rate_limiter
 
 logger = get_logger(__name__)
 
@@ -18,24 +24,60 @@ OPENAI = "openai"
 AZURE = "azure"
 
 
+def cache_per_loop[T](build: Callable[[], T]) -> Callable[[], T]:
+    """`functools.cache` for a builder of async clients, keeping one result per running event loop.
+
+    An async HTTP client is bound to the loop it first ran on, so reusing it
+    from another loop (each `asyncio.run`, each test loop) fails. Calls made
+    outside a running loop share one result; results of closed loops are dropped.
+    """
+    built: dict[asyncio.AbstractEventLoop | None, T] = {}
+
+    @functools.wraps(build)
+    def cached() -> T:
+        try:
+            loop: asyncio.AbstractEventLoop | None = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        for closed in [key for key in built if key is not None and key.is_closed()]:
+            del built[closed]
+        if loop not in built:
+            built[loop] = build()
+        return built[loop]
+
+    return cached
+
+
 def _build_openai_chat(model: str) -> ChatOpenAI:
+    rate_limiter = get_rate_limiter(model)
     return ChatOpenAI(
         model=model,
         api_key=SecretStr(os.environ["OPENAI_API_KEY"]),
+        # The default async client is shared process-wide by langchain_openai; give each model its own.
+        http_async_client=DefaultAsyncHttpxClient(),
+        cache=get_llm_cache(),
+        rate_limiter=rate_limiter,
+        callbacks=rate_limiter.callbacks if rate_limiter else None,
     )
 
 
 def _build_azure_chat(deployment: str) -> AzureChatOpenAI:
+    rate_limiter = get_rate_limiter(deployment)
     return AzureChatOpenAI(
         azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
         azure_deployment=deployment,
         api_key=SecretStr(os.environ["AZURE_OPENAI_KEY"]),
         api_version=os.getenv("OPENAI_API_VERSION", "2024-12-01-preview"),
         reasoning_effort="none",
+        cache=get_llm_cache(),
+        rate_limiter=rate_limiter,
+        callbacks=rate_limiter.callbacks if rate_limiter else None,
     )
 
 
+@cache_per_loop
 def build_model() -> ChatModel:
+    """Shared chat model client, created once per event loop so its HTTP connection pool is reused."""
     if cfg.LLM_PROVIDER == OPENAI:
         return _build_openai_chat(os.environ["OPENAI_MODEL"])
 
@@ -45,6 +87,7 @@ def build_model() -> ChatModel:
     raise ValueError
 
 
+@cache_per_loop
 def build_mini_model() -> ChatModel:
     if cfg.LLM_PROVIDER == OPENAI:
         return _build_openai_chat(os.environ["OPENAI_MODEL_MINI"])
@@ -1,16 +1,26 @@
 import os
-from collections.abc import Mapping
+from collections.abc import Iterable, Mapping
+from typing import TYPE_CHECKING, Any
 from uuid import uuid4
 
-from opentelemetry import _logs, trace
+from opentelemetry import _logs, metrics, trace
 from opentelemetry.exporter.otlp.proto.http._log_exporter import OTLPLogExporter
+from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
 from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+from opentelemetry.metrics import CallbackOptions, Observation
 from opentelemetry.sdk._logs import LoggerProvider
 from opentelemetry.sdk._logs.export import BatchLogRecordProcessor
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+    from echo.utils.llm_cache import LLMCache
+
 
 def setup_job_tracing(
     service_name: str,
@@ -77,6 +87,145 @@ def setup_logging(
     return logger_provider
 
 
+def setup_metrics(
+    *,
+    service_name: str,
+    attributes: Mapping[str, str] | None = None,
+    collector_endpoint: str | None = None,
+    export_interval_ms: int = 60_000,
+) -> MeterProvider:
+    collector_endpoint = collector_endpoint or os.environ["COLLECTOR_ENDPOINT"]
+    resource = Resource.create(
+        {
+            "service.name": service_name,
+            **(attributes or {}),
+        }
+    )
+
+    meter_provider = metrics.get_meter_provider()
+    if isinstance(meter_provider, MeterProvider):
+        return meter_provider
+
+    reader = PeriodicExportingMetricReader(
+        OTLPMetricExporter(endpoint=collector_endpoint),
+        export_interval_millis=export_interval_ms,
+    )
+    meter_provider = MeterProvider(resource=resource, metric_readers=[reader])
+    metrics.set_meter_provider(meter_provider)
+
+    return meter_provider
+
+
+def instrument_engine(engine: "AsyncEngine", *, name: str = "core", meter: metrics.Meter | None = None) -> None:
+    """Export connection pool metrics for `engine` through `meter` (default: the global meter provider's).
+
+    Reports connections checked out and in overflow (gauges), time spent
+    waiting for a connection on checkout (histogram, seconds) and connections
+    invalidated by a failed pre-ping or another disconnect on checkout
+    (counter). All carry a `db.pool.name` attribute set to `name`.
+    """
+    from sqlalchemy import event, exc
+    from sqlalchemy.pool import QueuePool
+
+    from echo.db.base import CHECKOUT_WAIT_KEY
+
+    meter = meter or metrics.get_meter(__name__)
+    attributes = {"db.pool.name": name}
+    sync_engine = engine.sync_engine
+
+    def observe(measure: str) -> Any:
+        def callback(options: CallbackOptions) -> Iterable[Observation]:
+            pool = sync_engine.pool
+            if isinstance(pool, QueuePool):
+                yield Observation(getattr(pool, measure)(), attributes)
+
+        return callback
+
+    meter.create_observable_gauge(
+        "db.pool.connections.checked_out",
+        callbacks=[observe("checkedout")],
+        description="Connections currently checked out of the pool",
+    )
+    meter.create_observable_gauge(
+        "db.pool.connections.overflow",
+        callbacks=[observe("overflow")],
+        description="Connections open beyond the pool size (negative while below it)",
+    )
+    wait_time = meter.create_histogram(
+        "db.pool.checkout.wait_time",
+        unit="s",
+        description="Time spent waiting for a pooled connection",
+    )
+    pre_ping_failures = meter.create_counter(
+        "db.pool.pre_ping.failures",
+        description="Connections invalidated on checkout by a failed pre-ping or disconnect",
+    )
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection: Any, record: Any, proxy: Any) -> None:
+        wait = record.info.pop(CHECKOUT_WAIT_KEY, None)
+        if wait is not None:
+            wait_time.record(wait, attributes)
+
+    @event.listens_for(sync_engine, "invalidate")
+    def _on_invalidate(dbapi_connection: Any, record: Any, exception: BaseException | None) -> None:
+        if isinstance(exception, exc.DisconnectionError):
+            pre_ping_failures.add(1, attributes)
+
+
+def instrument_llm_cache(cache: "LLMCache", *, meter: metrics.Meter | None = None) -> None:
+    """Export the hits and misses of an LLM response cache as `llm.cache.hits` and `llm.cache.misses` counters."""
+    meter = meter or metrics.get_meter(__name__)
+
+    def observe(measure: str) -> Any:
+        def callback(options: CallbackOptions) -> Iterable[Observation]:
+            yield Observation(getattr(cache, measure))
+
+        return callback
+
+    meter.create_observable_counter(
+        "llm.cache.hits",
+        callbacks=[observe("hits")],
+        description="LLM calls answered from the response cache",
+    )
+    meter.create_observable_counter(
+        "llm.cache.misses",
+        callbacks=[observe("misses")],
+        description="LLM calls that missed the response cache",
+    )
+
+
+def instrument_llm_rate_limiters(*, meter: metrics.Meter | None = None) -> None:
+    """Export requests, throttled requests and queueing time of every LLM rate limiter, per deployment."""
+    from echo.utils.rate_limit import get_rate_limiters
+
+    meter = meter or metrics.get_meter(__name__)
+
+    def observe(measure: str) -> Any:
+        def callback(options: CallbackOptions) -> Iterable[Observation]:
+            for limiter in get_rate_limiters():
+                yield Observation(getattr(limiter, measure), {"llm.deployment": limiter.deployment})
+
+        return callback
+
+    meter.create_observable_counter(
+        "llm.rate_limit.requests",
+        callbacks=[observe("acquired")],
+        description="LLM requests that went through the rate limiter",
+    )
+    meter.create_observable_counter(
+        "llm.rate_limit.throttled",
+        callbacks=[observe("throttled")],
+        description="LLM requests that had to wait for the rate limiter",
+    )
+    meter.create_observable_counter(
+        "llm.rate_limit.wait_time",
+        callbacks=[observe("wait_seconds")],
+        unit="s",
+        description="Time LLM requests spent queued in the rate limiter",
+    )
+
+
 def get_trace_id() -> str | None:
     span = trace.get_current_span()
     ctx = span.get_span_context()
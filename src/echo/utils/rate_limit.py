@@ -0,0 +1,233 @@
+import asyncio
+import os
+import threading
+import time
+from collections.abc import Awaitable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Self, cast
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.rate_limiters import BaseRateLimiter
+
+from echo.logger import get_logger
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+log = get_logger(__name__)
+
+DEFAULT_TOKENS_PER_REQUEST = 1000
+TOKEN_ESTIMATE_SMOOTHING = 0.2
+
+# Reserves `cost` from each bucket (requests, tokens) at once. Buckets refill
+# continuously up to their per-minute limit and may go negative; the caller
+# then waits until the deficit is refilled. A non-positive limit disables its
+# bucket. Returns the wait in seconds, or -1 when not blocking and the
+# reservation would have to wait (nothing is reserved then).
+_RESERVE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local blocking = ARGV[5] == '1'
+local wait = 0
+local levels = {}
+for i = 1, 2 do
+    local limit = tonumber(ARGV[i * 2 - 1])
+    local cost = tonumber(ARGV[i * 2])
+    if limit > 0 then
+        local rate = limit / 60
+        local state = redis.call('HMGET', KEYS[i], 'level', 'ts')
+        local level = tonumber(state[1]) or limit
+        local ts = tonumber(state[2]) or now
+        level = math.min(limit, level + (now - ts) * rate) - cost
+        levels[i] = level
+        if level < 0 then
+            wait = math.max(wait, -level / rate)
+        end
+    end
+end
+if wait > 0 and not blocking then
+    return '-1'
+end
+for i = 1, 2 do
+    if levels[i] ~= nil then
+        redis.call('HSET', KEYS[i], 'level', levels[i], 'ts', now)
+        redis.call('EXPIRE', KEYS[i], 120)
+    end
+end
+return tostring(wait)
+"""
+
+
+@dataclass(frozen=True)
+class RateLimits:
+    """Per-deployment limits; a non-positive value disables that limit."""
+
+    requests_per_minute: float = 0
+    tokens_per_minute: float = 0
+
+    @classmethod
+    def from_env(cls) -> Self | None:
+        """Read `LLM_REQUESTS_PER_MINUTE` and `LLM_TOKENS_PER_MINUTE`; None when neither is set."""
+        requests = os.getenv("LLM_REQUESTS_PER_MINUTE")
+        tokens = os.getenv("LLM_TOKENS_PER_MINUTE")
+        if not requests and not tokens:
+            return None
+        return cls(requests_per_minute=float(requests or 0), tokens_per_minute=float(tokens or 0))
+
+
+class _LocalBuckets:
+    def __init__(self, limits: RateLimits) -> None:
+        self.limits = (limits.requests_per_minute, limits.tokens_per_minute)
+        self.levels = list(self.limits)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, tokens: float, *, blocking: bool) -> float | None:
+        with self.lock:
+            now = time.monotonic()
+            elapsed, self.updated_at = now - self.updated_at, now
+            levels = list(self.levels)
+            wait = 0.0
+            for i, (limit, cost) in enumerate(zip(self.limits, (1, tokens), strict=True)):
+                if limit <= 0:
+                    continue
+                levels[i] = min(limit, levels[i] + elapsed * limit / 60) - cost
+                if levels[i] < 0:
+                    wait = max(wait, -levels[i] * 60 / limit)
+
+            if wait > 0 and not blocking:
+                # Keep the refill, drop the reservation.
+                self.levels = [level + cost for level, cost in zip(levels, (1, tokens), strict=True)]
+                return None
+            self.levels = levels
+            return wait
+
+
+class _UsageTracker(BaseCallbackHandler):
+    run_inline = True
+
+    def __init__(self, limiter: "LLMRateLimiter") -> None:
+        self.limiter = limiter
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if total := usage.get("total_tokens"):
+            self.limiter.record_usage(total)
+
+
+class LLMRateLimiter(BaseRateLimiter):
+    """Token-bucket limiter for one model deployment, on requests and tokens per minute.
+
+    Each call reserves one request and the running average of tokens per call
+    (learnt from the usage reported through `callbacks`, which must be
+    attached to the model) and waits until both buckets can cover it, instead
+    of letting the provider answer with 429s. Callers queue in arrival order.
+    With `redis`, async calls share the buckets of every process using the
+    same deployment; sync calls and Redis failures fall back to the
+    in-process buckets.
+    """
+
+    def __init__(
+        self,
+        deployment: str,
+        limits: RateLimits,
+        *,
+        redis: "Redis | None" = None,
+        tokens_per_request: float = DEFAULT_TOKENS_PER_REQUEST,
+    ) -> None:
+        self.deployment = deployment
+        self.limits = limits
+        self.redis = redis
+        self.tokens_per_request = tokens_per_request
+        self.callbacks: list[BaseCallbackHandler] = [_UsageTracker(self)]
+        self._local = _LocalBuckets(limits)
+
+        self.acquired = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+
+    def record_usage(self, tokens: int) -> None:
+        self.tokens_per_request += TOKEN_ESTIMATE_SMOOTHING * (tokens - self.tokens_per_request)
+
+    def _record(self, wait: float) -> None:
+        self.acquired += 1
+        if wait > 0:
+            self.throttled += 1
+            self.wait_seconds += wait
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        wait = self._local.reserve(self.tokens_per_request, blocking=blocking)
+        if wait is None:
+            return False
+        self._record(wait)
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        wait = await self._reserve(blocking=blocking)
+        if wait is None:
+            return False
+        self._record(wait)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return True
+
+    async def _reserve(self, *, blocking: bool) -> float | None:
+        if self.redis is None:
+            return self._local.reserve(self.tokens_per_request, blocking=blocking)
+
+        from redis.exceptions import RedisError
+
+        key = f"echo:llm:ratelimit:{self.deployment}"
+        try:
+            # redis-py types eval as sync-or-async; the asyncio client always returns an awaitable.
+            raw = await cast(
+                Awaitable[str],
+                self.redis.eval(
+                    _RESERVE_SCRIPT,
+                    2,
+                    f"{key}:requests",
+                    f"{key}:tokens",
+                    self.limits.requests_per_minute,
+                    1,
+                    self.limits.tokens_per_minute,
+                    self.tokens_per_request,
+                    int(blocking),
+                ),
+            )
+        except RedisError:
+            log.warning("Rate limiting through Redis failed for %s", self.deployment, exc_info=True)
+            return self._local.reserve(self.tokens_per_request, blocking=blocking)
+
+        wait = float(raw)
+        return None if wait < 0 else wait
+
+
+_limiters: dict[str, LLMRateLimiter] = {}
+
+
+def get_rate_limiter(deployment: str) -> LLMRateLimiter | None:
+    """Process-wide limiter for `deployment`, or None when no limits are configured.
+
+    Limits come from `RateLimits.from_env` and apply to each deployment
+    separately. With `LLM_RATE_LIMIT_REDIS=true` they are shared across
+    processes through Redis.
+    """
+    if deployment not in _limiters:
+        limits = RateLimits.from_env()
+        if limits is None:
+            return None
+
+        redis = None
+        if os.getenv("LLM_RATE_LIMIT_REDIS", "false").lower() == "true":
+            from echo.utils.redis import RedisClient
+
+            redis = RedisClient.get()
+        _limiters[deployment] = LLMRateLimiter(deployment, limits, redis=redis)
+    return _limiters[deployment]
+
+
+def get_rate_limiters() -> list[LLMRateLimiter]:
+    return list(_limiters.values())
@@ -1,6 +1,63 @@
+import math
 import os
+from collections.abc import AsyncIterator, Mapping, Sequence
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Self
 
-from redis.asyncio import Redis
+from redis.asyncio import BlockingConnectionPool, Connection, Redis, SSLConnection
+from redis.asyncio.client import Pipeline
+
+
+@dataclass(frozen=True)
+class RedisConfig:
+    """Connection settings, read from `REDIS_*` environment variables by `from_env`.
+
+    The pool holds at most `max_connections`; when they are all busy, callers
+    wait up to `pool_timeout` seconds for one instead of failing. Idle
+    connections are checked with a PING before reuse once
+    `health_check_interval` seconds have passed.
+    """
+
+    host: str
+    port: int
+    password: str | None = None
+    tls: bool = True
+    max_connections: int = 50
+    pool_timeout: float = 5.0
+    health_check_interval: int = 30
+    socket_timeout: float = 5.0
+    socket_connect_timeout: float = 5.0
+
+    @classmethod
+    def from_env(cls) -> Self:
+        host, port = os.environ["REDIS_ADDRESS"].split(":")
+        return cls(
+            host=host,
+            port=int(port),
+            password=os.environ["REDIS_PASSWORD"],
+            tls=(os.getenv("REDIS_TLS") or str(cls.tls)).lower() == "true",
+            max_connections=int(os.getenv("REDIS_MAX_CONNECTIONS") or cls.max_connections),
+            pool_timeout=float(os.getenv("REDIS_POOL_TIMEOUT") or cls.pool_timeout),
+            health_check_interval=int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL") or cls.health_check_interval),
+            socket_timeout=float(os.getenv("REDIS_SOCKET_TIMEOUT") or cls.socket_timeout),
+            socket_connect_timeout=float(os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT") or cls.socket_connect_timeout),
+        )
+
+
+def create_client(config: RedisConfig) -> Redis:
+    pool = BlockingConnectionPool(
+        max_connections=config.max_connections,
+        timeout=config.pool_timeout,
+        connection_class=SSLConnection if config.tls else Connection,
+        host=config.host,
+        port=config.port,
+        password=config.password,
+        health_check_interval=config.health_check_interval,
+        socket_timeout=config.socket_timeout,
+        socket_connect_timeout=config.socket_connect_timeout,
+    )
+    return Redis.from_pool(pool)
 
 
 class RedisClient:
@@ -8,24 +65,48 @@ class RedisClient:
 
     @classmethod
     def get(cls) -> Redis:
-        password = os.environ["REDIS_PASSWORD"]
-        address = os.environ["REDIS_ADDRESS"]
-        host = address.split(":")[0]
-        port = address.split(":")[1]
-        tls = os.getenv("REDIS_TLS", "true").lower() == "true"
-
+        """Process-wide client, configured from the environment on first use."""
         if cls._client is None:
-            cls._client = Redis(
-                host=host,
-                port=int(port),
-                password=password,
-                ssl=tls,
-            )
+            cls._client = create_client(RedisConfig.from_env())
 
         return cls._client
 
     @classmethod
     async def close(cls) -> None:
         if cls._client:
-            await cls._client.close()
+            await cls._client.aclose()
             cls._client = None
+
+
+@asynccontextmanager
+async def pipeline(redis: Redis | None = None, *, transaction: bool = False) -> AsyncIterator[Pipeline]:
+    """Queue commands on a pipeline and send them in one round trip when the block exits.
+
+    Nothing is sent if the block raises. Uses the shared client unless `redis`
+    is given.
+    """
+    async with (redis or RedisClient.get()).pipeline(transaction=transaction) as pipe:
+        yield pipe
+        await pipe.execute()
+
+
+async def get_many(keys: Sequence[str], *, redis: Redis | None = None) -> list[bytes | None]:
+    """Read `keys` with a single MGET, returning None for the missing ones."""
+    if not keys:
+        return []
+    return list(await (redis or RedisClient.get()).mget(keys))
+
+
+async def set_many(items: Mapping[str, str | bytes], *, ttl: float | None = None, redis: Redis | None = None) -> None:
+    """Write `items` in one pipelined round trip, expiring them after `ttl` seconds if given.
+
+    `ttl` is rounded up to whole milliseconds, Redis' expiry resolution.
+    """
+    if ttl is not None and ttl <= 0:
+        raise ValueError("ttl must be positive")
+    if not items:
+        return
+    px = math.ceil(ttl * 1000) if ttl is not None else None
+    async with pipeline(redis) as pipe:
+        for key, value in items.items():
+            pipe.set(key, value, px=px)
@@ -0,0 +1,109 @@
+import asyncio
+import json
+from collections.abc import Awaitable, Callable, Sequence
+from datetime import timedelta
+
+import echo.events.v1 as events
+from echo.db.models.scheduled_call import ScheduledCall
+from echo.logger import get_logger
+from echo.store.schedule_calls import DISPATCH_VISIBILITY_TIMEOUT
+from echo.store.store import PostgresStore
+from echo.utils.queue import Queue
+
+log = get_logger(__name__)
+
+
+def _warn_lost_claims(kind: str, lost: int) -> None:
+    if lost:
+        # Another dispatcher re-claimed them after the visibility timeout, or they were rescheduled.
+        log.warning("Lost the claim on %d scheduled %s before settling them", lost, kind)
+
+
+async def _publish[K](queue: Queue, batch: Sequence[tuple[K, events.BaseEvent]]) -> tuple[list[K], list[K]]:
+    sent: list[K] = []
+    failed: list[K] = []
+    for key, event in batch:
+        try:
+            await queue.send_event(event)
+        except Exception:
+            log.warning("Failed to publish scheduled %s", key, exc_info=True)
+            failed.append(key)
+        else:
+            sent.append(key)
+    return sent, failed
+
+
+async def dispatch_due_events(
+    queue: Queue,
+    *,
+    limit: int = 100,
+    visibility_timeout: timedelta = DISPATCH_VISIBILITY_TIMEOUT,
+) -> int:
+    """Claim due `scheduled_events`, publish their payloads to `queue` and mark them dispatched.
+
+    The claim is committed before publishing, so any number of dispatchers can
+    run side by side. Events whose publish fails are released back to
+    `pending`; if the dispatcher dies mid-batch they are re-claimed after
+    `visibility_timeout` (delivery is at-least-once). Returns the number of
+    events published.
+    """
+    async with PostgresStore.open() as store:
+        claimed = await store.scheduled_events.claim_due(limit, visibility_timeout=visibility_timeout)
+
+    batch = []
+    invalid = []
+    for row in claimed:
+        payload = row.payload if isinstance(row.payload, str) else json.dumps(row.payload)
+        try:
+            batch.append((row.id, events.deserialize_event(payload.encode())))
+        except ValueError:
+            log.error("Dropping scheduled event %s with an invalid payload", row.id)
+            invalid.append(row)
+
+    sent, failed = await _publish(queue, batch)
+    by_id = {row.id: row for row in claimed}
+
+    async with PostgresStore.open() as store:
+        settled = await store.scheduled_events.mark_dispatched([*(by_id[id_] for id_ in sent), *invalid])
+        settled += await store.scheduled_events.release([by_id[id_] for id_ in failed])
+    _warn_lost_claims("events", len(claimed) - settled)
+
+    return len(sent)
+
+
+async def dispatch_due_calls(
+    queue: Queue,
+    build_event: Callable[[ScheduledCall], events.BaseEvent],
+    *,
+    limit: int = 100,
+    visibility_timeout: timedelta = DISPATCH_VISIBILITY_TIMEOUT,
+) -> int:
+    """Claim due `schedule_calls`, publish `build_event(call)` for each and mark them finished.
+
+    Same delivery guarantees as `dispatch_due_events`.
+    """
+    async with PostgresStore.open() as store:
+        claimed = await store.schedule_calls.claim_due(limit, visibility_timeout=visibility_timeout)
+
+    sent, failed = await _publish(queue, [(call.opportunity_id, build_event(call)) for call in claimed])
+    by_id = {call.opportunity_id: call for call in claimed}
+
+    async with PostgresStore.open() as store:
+        settled = await store.schedule_calls.mark_finished_many([by_id[id_] for id_ in sent])
+        settled += await store.schedule_calls.release([by_id[id_] for id_ in failed])
+    _warn_lost_claims("calls", len(claimed) - settled)
+
+    return len(sent)
+
+
+async def run_dispatcher(dispatch: Callable[[], Awaitable[int]], *, interval: float = 1.0) -> None:
+    """Run `dispatch` forever, draining back-to-back while it finds work and sleeping `interval` when idle."""
+    while True:
+        try:
+            dispatched = await dispatch()
+        except Exception:
+            log.exception("Scheduled dispatch failed")
+            dispatched = 0
+
+        if not dispatched:
+            await asyncio.sleep(interval)
@@ -0,0 +1,349 @@
+import asyncio
+import io
+import json
+import os
+import tarfile
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Literal, TextIO
+
+from echo.db.models.insight import CallRecord
+from echo.logger import get_logger
+from echo.storage import get_storage
+from echo.store.store import PostgresStore
+
+log = get_logger(__name__)
+
+type ExportFormat = Literal["files", "tar", "jsonl"]
+
+# Longest time exported entries wait to be synced to disk and checkpointed.
+_CHECKPOINT_INTERVAL = 5.0
+
+
+@dataclass
+class ExportStats:
+    exported: int = 0
+    cached: int = 0
+    skipped: int = 0
+    failed: int = 0
+    total: int = 0
+
+
+@dataclass
+class _Transcription:
+    opportunity_id: str
+    room_id: str
+    score: str | None
+    processed_at: datetime | None
+    text: str
+
+
+def report_to_transcription(report: dict[str, Any]) -> str:
+    """Convert a LiveKit session report into a clean, readable transcription."""
+    lines: list[str] = []
+    events = report.get("events", [])
+
+    for event in events:
+        event_type = event.get("type")
+
+        if event_type == "user_input_transcribed" and event.get("is_final"):
+            text = event.get("transcript", "").strip()
+            if text:
+                lines.append(f"User:  {text}")
+
+        elif event_type == "conversation_item_added":
+            item = event.get("item", {})
+            if item.get("type") == "message" and item.get("role") == "assistant":
+                parts = item.get("content", [])
+                text = " ".join(parts).strip()
+                if text:
+                    lines.append(f"Agent: {text}")
+
+    return "\n\n".join(lines)
+
+
+def get_transcription_path(
+    processed_at: datetime | None,
+    score: str | int | None,
+    opportunity_id: str,
+) -> Path:
+    date_label = processed_at.strftime("%Y-%m-%d") if processed_at else "unknown-date"
+    score_label = str(score) if score is not None else "unscored"
+    return Path(date_label) / score_label / f"{opportunity_id}.txt"
+
+
+class _TranscriptionWriter:
+    def __init__(self, output: Path, output_format: ExportFormat, *, append: bool) -> None:
+        self.output = output
+        self.output_format = output_format
+        self._tar: tarfile.TarFile | None = None
+        self._archive: BinaryIO | None = None
+        self._jsonl: TextIO | None = None
+        self._unsynced: list[Path] = []
+
+        if output_format == "files":
+            output.mkdir(parents=True, exist_ok=True)
+            return
+
+        output.parent.mkdir(parents=True, exist_ok=True)
+        mode: Literal["a", "w"] = "a" if append and output.exists() else "w"
+        if mode == "a":
+            _drop_partial_output(output, output_format)
+        if output_format == "tar":
+            self._archive = open(output, "r+b" if mode == "a" else "wb")
+            self._tar = tarfile.open(fileobj=self._archive, mode=mode)
+        else:
+            self._jsonl = open(output, mode, encoding="utf-8")
+
+    def exists(self, path: Path) -> bool:
+        return self.output_format == "files" and (self.output / path).exists()
+
+    def write(self, transcription: _Transcription) -> None:
+        path = get_transcription_path(
+            transcription.processed_at,
+            transcription.score,
+            transcription.opportunity_id,
+        )
+
+        if self._tar is not None:
+            data = transcription.text.encode("utf-8")
+            info = tarfile.TarInfo(path.as_posix())
+            info.size = len(data)
+            info.mtime = int(time.time())
+            self._tar.addfile(info, io.BytesIO(data))
+        elif self._jsonl is not None:
+            record = {
+                "opportunity_id": transcription.opportunity_id,
+                "room_id": transcription.room_id,
+                "score": transcription.score,
+                "processed_at": transcription.processed_at.isoformat() if transcription.processed_at else None,
+                "transcription": transcription.text,
+            }
+            self._jsonl.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            filepath = self.output / path
+            filepath.parent.mkdir(parents=True, exist_ok=True)
+            # Write under a temporary name so an interrupted export never leaves a truncated file behind.
+            partial = filepath.with_name(f"{filepath.name}.partial")
+            partial.write_text(transcription.text, encoding="utf-8")
+            partial.replace(filepath)
+            self._unsynced.append(filepath)
+
+    def flush(self) -> None:
+        """Make everything written so far durable, before it is recorded in the checkpoint."""
+        file = self._archive or self._jsonl
+        if file is not None:
+            file.flush()
+            os.fsync(file.fileno())
+
+        directories = {path.parent for path in self._unsynced}
+        for path in [*self._unsynced, *directories]:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        self._unsynced.clear()
+
+    def close(self) -> None:
+        if self._tar is not None:
+            self._tar.close()
+        if self._archive is not None:
+            self._archive.close()
+        if self._jsonl is not None:
+            self._jsonl.close()
+
+
+def _drop_partial_output(output: Path, output_format: ExportFormat) -> None:
+    """Cut an archive or JSONL file left by an unclean stop back to its last complete entry.
+
+    Entries written after the last checkpointed one are not in the checkpoint
+    and will be exported again, so dropping them loses nothing.
+    """
+    size = output.stat().st_size
+    if output_format == "jsonl":
+        with open(output, "r+b") as f:
+            end = size
+            while end > 0:
+                start = max(0, end - (1 << 16))
+                f.seek(start)
+                newline = f.read(end - start).rfind(b"\n")
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+            if end != size:
+                f.truncate(end)
+        return
+
+    end = 0
+    try:
+        with tarfile.open(output) as tar:
+            for member in tar:
+                member_end = member.offset_data + -(-member.size // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+                if member_end > size:
+                    break
+                end = member_end
+    except tarfile.ReadError:
+        pass
+    # Drop anything after the last complete member and end the archive there, so
+    # append mode finds the end-of-archive marker where the next member belongs.
+    with open(output, "r+b") as f:
+        f.truncate(end)
+        f.seek(end)
+        f.write(bytes(2 * tarfile.BLOCKSIZE))
+
+
+def _load_checkpoint(checkpoint: Path | None) -> set[str]:
+    if checkpoint is None or not checkpoint.exists():
+        return set()
+    return {line for line in checkpoint.read_text(encoding="utf-8").splitlines() if line}
+
+
+async def export_campaign_transcriptions(
+    campaign_id: str,
+    output: Path,
+    *,
+    output_format: ExportFormat = "files",
+    concurrency: int = 16,
+    checkpoint: Path | None = None,
+    checkpoint_every: int = 100,
+    force: bool = False,
+) -> ExportStats:
+    """Export the latest call transcription of every opportunity in a campaign.
+
+    Reports are fetched with at most `concurrency` requests in flight and written
+    as they arrive by a single writer, either as a directory tree of text files,
+    a tar archive or a JSONL file. Every `checkpoint_every` entries, and at least
+    every few seconds, the output is synced to disk and the opportunities written
+    since are appended to `checkpoint`, so an interrupted export resumes after
+    the last synced entry. With a checkpoint, only the opportunities it lists
+    count as exported, whatever the output format.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if checkpoint_every < 1:
+        raise ValueError("checkpoint_every must be at least 1")
+
+    async with PostgresStore.open() as store:
+        records = await store.analytics.get_latest_call_records(campaign_id)
+    log.info("Found call records for %d opportunities in campaign %s", len(records), campaign_id)
+
+    stats = ExportStats(total=len(records))
+    if force and checkpoint is not None:
+        checkpoint.unlink(missing_ok=True)
+    done = _load_checkpoint(checkpoint)
+
+    writer = _TranscriptionWriter(output, output_format, append=bool(done))
+    pending: list[CallRecord] = []
+    for record in records:
+        if not record.opportunity_id or not record.room_id:
+            log.debug("No room_id for opportunity %s", record.opportunity_id)
+            stats.skipped += 1
+            continue
+
+        path = get_transcription_path(record.processed_at, record.score, record.opportunity_id)
+        if record.opportunity_id in done or (checkpoint is None and not force and writer.exists(path)):
+            stats.cached += 1
+            continue
+
+        pending.append(record)
+
+    try:
+        await _run_export(
+            pending,
+            writer,
+            checkpoint,
+            stats,
+            concurrency=concurrency,
+            checkpoint_every=checkpoint_every,
+        )
+    finally:
+        writer.close()
+
+    log.info(
+        "Done. exported=%d cached=%d skipped=%d failed=%d total=%d",
+        stats.exported,
+        stats.cached,
+        stats.skipped,
+        stats.failed,
+        stats.total,
+    )
+    return stats
+
+
+async def _run_export(
+    records: Sequence[CallRecord],
+    writer: _TranscriptionWriter,
+    checkpoint: Path | None,
+    stats: ExportStats,
+    *,
+    concurrency: int,
+    checkpoint_every: int,
+) -> None:
+    storage = await get_storage()
+    todo = iter(records)
+    results: asyncio.Queue[_Transcription | None] = asyncio.Queue(maxsize=concurrency * 2)
+
+    async def _fetch() -> None:
+        for record in todo:
+            room_id = str(record.room_id)
+            try:
+                report = await storage.fetch_report(room_id)
+            except Exception:
+                log.warning("Failed to fetch report for room_id=%s", room_id, exc_info=True)
+                stats.failed += 1
+                continue
+
+            await results.put(
+                _Transcription(
+                    opportunity_id=str(record.opportunity_id),
+                    room_id=room_id,
+                    score=record.score,
+                    processed_at=record.processed_at,
+                    text=report_to_transcription(report),
+                )
+            )
+
+    async def _fetch_all() -> None:
+        try:
+            await asyncio.gather(*(_fetch() for _ in range(min(concurrency, len(records)))))
+        finally:
+            await results.put(None)
+
+    checkpoint_file = open(checkpoint, "a", encoding="utf-8") if checkpoint is not None else None
+    unsaved: list[str] = []
+    saved_at = time.monotonic()
+
+    def _save_checkpoint() -> None:
+        nonlocal saved_at
+        saved_at = time.monotonic()
+        if not unsaved:
+            return
+        # Entries reach the checkpoint only once the output holding them is on disk.
+        writer.flush()
+        if checkpoint_file is not None:
+            checkpoint_file.writelines(f"{opportunity_id}\n" for opportunity_id in unsaved)
+            checkpoint_file.flush()
+        unsaved.clear()
+
+    producer = asyncio.create_task(_fetch_all())
+    try:
+        while (transcription := await results.get()) is not None:
+            writer.write(transcription)
+            stats.exported += 1
+            unsaved.append(transcription.opportunity_id)
+            if len(unsaved) >= checkpoint_every or time.monotonic() - saved_at >= _CHECKPOINT_INTERVAL:
+                _save_checkpoint()
+            log.debug("Saved transcription for opportunity %s", transcription.opportunity_id)
+        await producer
+    finally:
+        producer.cancel()
+        try:
+            _save_checkpoint()
+        finally:
+            if checkpoint_file is not None:
+                checkpoint_file.close()
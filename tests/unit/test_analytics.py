@@ -0,0 +1,202 @@
+import asyncio
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import Text, literal_column, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from echo.db.models.insight import CallRecord
+from echo.store.analytics import CallMetric
+from echo.store.store import PostgresStore
+
+
+@dataclass
+class Insight:
+    score: str
+    answer: bool = True
+    voicemail_answer: bool = False
+    availability: str | None = None
+    recording_consent: bool | None = None
+    program: str | None = None
+    motivation: str | None = None
+    work_status: str = "employed"
+    financial_interest: bool = False
+    financial_topics: list[str] = field(default_factory=list)
+    financial_details: str | None = None
+    objection: str | None = None
+    summary: str = "a summary"
+    callback_requested: bool = False
+    callback_reference_day: str | None = None
+    callback_at: datetime | None = None
+    quality_notes: str | None = None
+    user_satisfaction: str | None = None
+    frustration: bool = False
+    hallucination_detected: bool = False
+    compliance_risk_detected: bool = False
+
+
+def build_metric(campaign_id: str, room_id: str, score: str) -> CallMetric:
+    return CallMetric(
+        campaign_id=campaign_id,
+        room_id=room_id,
+        opportunity_id=str(uuid4()),
+        thread_id=uuid4(),
+        user_name="Test",
+        user_phone=None,
+        user_email=None,
+        plancode="PLAN",
+        market="es",
+        duration=60,
+        insight=Insight(score=score),
+        recording_url="url",
+    )
+
+
+@pytest_asyncio.fixture
+async def store(sessionmaker: async_sessionmaker[AsyncSession]) -> AsyncIterator[PostgresStore]:
+    async with sessionmaker() as session:
+        yield PostgresStore(session)
+
+
+@pytest.mark.asyncio
+async def test_insert_call_metrics_upsert(store: PostgresStore) -> None:
+    campaign_id = str(uuid4())
+    room_a, room_b = str(uuid4()), str(uuid4())
+
+    await store.analytics.insert_call_metrics(
+        [build_metric(campaign_id, room_a, "A"), build_metric(campaign_id, room_b, "B")],
+    )
+    await store.session.commit()
+
+    await store.analytics.insert_call_metrics(
+        [build_metric(campaign_id, room_a, "C")],
+        upsert=True,
+    )
+    await store.session.commit()
+
+    records = await store.analytics.get_call_records(campaign_id)
+
+    assert sorted((r.room_id, r.score) for r in records) == sorted([(room_a, "C"), (room_b, "B")])
+
+
+@pytest.mark.asyncio
+async def test_concurrent_upserts_keep_one_record(sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    campaign_id = str(uuid4())
+    room_id = str(uuid4())
+
+    async with sessionmaker() as session:
+        await PostgresStore(session).analytics.insert_call_metrics([build_metric(campaign_id, room_id, "A")])
+        await session.commit()
+
+    async with sessionmaker() as first, sessionmaker() as second:
+        await PostgresStore(first).analytics.insert_call_metrics([build_metric(campaign_id, room_id, "B")], upsert=True)
+        upsert = asyncio.create_task(
+            PostgresStore(second).analytics.insert_call_metrics([build_metric(campaign_id, room_id, "C")], upsert=True)
+        )
+        await asyncio.sleep(0.2)
+        assert not upsert.done()
+
+        await first.commit()
+        await upsert
+        await second.commit()
+
+    async with sessionmaker() as session:
+        records = await PostgresStore(session).analytics.get_call_records(campaign_id)
+
+    assert [r.score for r in records] == ["C"]
+
+
+@pytest.mark.asyncio
+async def test_campaign_summary(store: PostgresStore) -> None:
+    campaign_id = str(uuid4())
+    metrics = [build_metric(campaign_id, str(uuid4()), score) for score in ("A", "A", "B")]
+    metrics[2]["market"] = "mx"
+    metrics[2]["insight"] = Insight(score="B", answer=False, voicemail_answer=True, frustration=True)
+    metrics[2]["duration"] = 30
+    await store.analytics.insert_call_metrics(metrics)
+    await store.session.commit()
+
+    [overall] = await store.analytics.campaign_summary(campaign_id)
+    assert overall.bucket is None
+    assert overall.calls == 3
+    assert overall.answer_rate == pytest.approx(2 / 3)
+    assert overall.voicemail_rate == pytest.approx(1 / 3)
+    assert overall.frustration_rate == pytest.approx(1 / 3)
+    assert overall.avg_duration_seconds == pytest.approx(50)
+    assert overall.score_distribution == {"A": 2, "B": 1}
+
+    by_market = {s.bucket: s for s in await store.analytics.campaign_summary(campaign_id, group_by="market")}
+    assert by_market["es"].calls == 2
+    assert by_market["mx"].score_distribution == {"B": 1}
+
+    await store.analytics.refresh_campaign_rollup(campaign_id)
+    await store.analytics.refresh_campaign_rollup(campaign_id)
+    await store.session.commit()
+
+    [rolled_up] = await store.analytics.campaign_summary(campaign_id, use_rollup=True)
+    assert rolled_up == overall
+
+    by_day = await store.analytics.campaign_summary(campaign_id, group_by="day", use_rollup=True)
+    assert [s.calls for s in by_day] == [3]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_rollup_refreshes(sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    campaign_id = str(uuid4())
+
+    async with sessionmaker() as session:
+        metrics = [build_metric(campaign_id, str(uuid4()), "A") for _ in range(3)]
+        await PostgresStore(session).analytics.insert_call_metrics(metrics)
+        await session.commit()
+
+    async with sessionmaker() as first, sessionmaker() as second:
+        await PostgresStore(first).analytics.refresh_campaign_rollup(campaign_id)
+        refresh = asyncio.create_task(PostgresStore(second).analytics.refresh_campaign_rollup(campaign_id))
+        await asyncio.sleep(0.2)
+
+        await first.commit()
+        await refresh
+        await second.commit()
+
+    async with sessionmaker() as session:
+        [summary] = await PostgresStore(session).analytics.campaign_summary(campaign_id, use_rollup=True)
+
+    assert summary.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_partition_maintenance(store: PostgresStore) -> None:
+    campaign_id = str(uuid4())
+    processed_at = datetime(2001, 1, 15, tzinfo=UTC)
+    store.session.add(CallRecord(campaign_id=campaign_id, room_id=str(uuid4()), processed_at=processed_at))
+    await store.session.commit()
+
+    partitions = ["call_history_details_p200101", "call_history_details_p200102"]
+    try:
+        created = await store.analytics.ensure_partitions(months_ahead=1, now=datetime(2001, 1, 3, tzinfo=UTC))
+        await store.session.commit()
+
+        assert created == partitions
+        assert await store.analytics.ensure_partitions(months_ahead=1, now=datetime(2001, 1, 3, tzinfo=UTC)) == []
+
+        partition = await store.session.scalar(
+            select(literal_column("tableoid::regclass::text", Text)).where(CallRecord.campaign_id == campaign_id)
+        )
+        assert partition == "call_history_details_p200101"
+
+        detached = await store.analytics.detach_partitions(datetime(2001, 2, 10, tzinfo=UTC), drop=True)
+        await store.session.commit()
+
+        assert detached == ["call_history_details_p200101"]
+        assert await store.analytics.get_call_records(campaign_id) == []
+        assert "call_history_details_p200102" in await store.analytics.get_partitions()
+    finally:
+        # Partitions persist in the shared test database; drop them so reruns start clean.
+        await store.session.rollback()
+        for name in partitions:
+            await store.session.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+        await store.session.commit()
@@ -0,0 +1,67 @@
+import fakeredis
+import pytest
+from redis.asyncio import BlockingConnectionPool
+
+from echo.utils.cache import TieredCache, TTLCache
+from echo.utils.redis import RedisConfig, create_client, set_many
+
+
+def test_ttl_cache_expires_and_evicts() -> None:
+    cache: TTLCache[int] = TTLCache(ttl=60, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+
+    assert cache.get("a") is None
+    assert (cache.get("b"), cache.get("c")) == (2, 3)
+
+    expired: TTLCache[int] = TTLCache(ttl=0)
+    expired.set("a", 1)
+    assert expired.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_without_redis() -> None:
+    cache = TieredCache("test", ttl=60)
+    await cache.set_many({"a": "1", "b": "2"})
+    await cache.delete(["a"])
+
+    assert await cache.get("a") is None
+    assert await cache.get("b") == "2"
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_get_many_without_redis() -> None:
+    cache = TieredCache("test", ttl=60)
+    await cache.set_many({"a": "1", "b": "2"})
+
+    assert await cache.get_many(["a", "b", "c"]) == {"a": "1", "b": "2"}
+
+
+@pytest.mark.asyncio
+async def test_set_many_rounds_ttl_up_to_a_millisecond() -> None:
+    redis = fakeredis.FakeAsyncRedis()
+    # Truncating to milliseconds would send PX 0, which Redis rejects.
+    await set_many({"a": "1"}, ttl=0.0004, redis=redis)
+
+    with pytest.raises(ValueError, match="ttl"):
+        await set_many({"b": "2"}, ttl=0, redis=redis)
+    assert await redis.exists("b") == 0
+
+
+def test_redis_config_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("REDIS_ADDRESS", "cache.local:6380")
+    monkeypatch.setenv("REDIS_PASSWORD", "secret")
+    monkeypatch.setenv("REDIS_TLS", "false")
+    monkeypatch.setenv("REDIS_MAX_CONNECTIONS", "8")
+    monkeypatch.setenv("REDIS_SOCKET_TIMEOUT", "")
+
+    config = RedisConfig.from_env()
+    client = create_client(config)
+    pool = client.connection_pool
+
+    assert (config.host, config.port, config.tls) == ("cache.local", 6380, False)
+    assert config.socket_timeout == RedisConfig.socket_timeout
+    assert isinstance(pool, BlockingConnectionPool)
+    assert pool.max_connections == 8
+    assert pool.connection_kwargs["health_check_interval"] == config.health_check_interval
@@ -0,0 +1,116 @@
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+from uuid import UUID, uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from echo.db.models.campaign import Campaign, CampaignStatus
+from echo.db.models.campaign_detail import CampaignDetail, CampaignUserStatus
+from echo.store.campaigns import CallAttempt
+from echo.store.store import PostgresStore
+
+
+def attempt(detail_id: UUID, status: CampaignUserStatus, next_call_after: datetime | None = None) -> CallAttempt:
+    return CallAttempt(
+        detail_id=detail_id,
+        status=status,
+        called_at=datetime.now(UTC),
+        next_call_after=next_call_after,
+    )
+
+
+@pytest_asyncio.fixture
+async def campaign(sessionmaker: async_sessionmaker[AsyncSession]) -> AsyncIterator[Campaign]:
+    async with sessionmaker() as session:
+        store = PostgresStore(session)
+        campaign = Campaign(name="test", market="es", agent_name="agent", status=CampaignStatus.ACTIVE, total_users=6)
+        session.add(campaign)
+        await session.flush()
+
+        opportunity_ids = [str(uuid4()) for _ in range(6)]
+        await store.users.bulk_upsert_users([{"opportunity_id": opportunity_id} for opportunity_id in opportunity_ids])
+        session.add_all(
+            CampaignDetail(campaign_id=campaign.id, opportunity_id=opportunity_id, market="es", plancode="PLAN")
+            for opportunity_id in opportunity_ids
+        )
+        await session.commit()
+        yield campaign
+
+
+@pytest.mark.asyncio
+async def test_claim_users_and_record_attempts(
+    sessionmaker: async_sessionmaker[AsyncSession],
+    campaign: Campaign,
+) -> None:
+    async def claim(limit: int) -> list[CampaignDetail]:
+        async with sessionmaker() as session:
+            claimed = await PostgresStore(session).campaigns.claim_users(campaign.id, limit)
+            await session.commit()
+            return claimed
+
+    batches = await asyncio.gather(claim(2), claim(2), claim(2))
+    claimed_ids = [detail.id for batch in batches for detail in batch]
+    assert len(claimed_ids) == len(set(claimed_ids)) == 6
+    assert await claim(10) == []
+
+    now = datetime.now(UTC)
+    completed, retry_later, retry_now, *_ = claimed_ids
+    async with sessionmaker() as session:
+        store = PostgresStore(session)
+        await store.campaigns.record_attempts(
+            [
+                {
+                    "detail_id": completed,
+                    "status": CampaignUserStatus.COMPLETED,
+                    "called_at": now,
+                    "next_call_after": None,
+                },
+                {
+                    "detail_id": retry_later,
+                    "status": CampaignUserStatus.RETRY,
+                    "called_at": now,
+                    "next_call_after": now + timedelta(hours=1),
+                    "failure_reason": "no answer",
+                },
+                {
+                    "detail_id": retry_now,
+                    "status": CampaignUserStatus.RETRY,
+                    "called_at": now,
+                    "next_call_after": now - timedelta(minutes=1),
+                },
+            ]
+        )
+        await session.commit()
+
+    assert [detail.id for detail in await claim(10)] == [retry_now]
+
+    async with sessionmaker() as session:
+        store = PostgresStore(session)
+        await store.campaigns.record_attempts(
+            [
+                {
+                    "detail_id": retry_now,
+                    "status": CampaignUserStatus.COMPLETED,
+                    "called_at": now,
+                    "next_call_after": None,
+                }
+            ]
+        )
+        await session.commit()
+
+        refreshed = await store.campaigns.get_campaign(campaign.id)
+        assert refreshed is not None
+        assert refreshed.completed_users == 2
+
+        detail = await session.get(CampaignDetail, retry_later)
+        assert detail is not None
+        assert detail.status == CampaignUserStatus.RETRY
+        assert detail.last_called_at == now
+        assert detail.attempts[-1]["next_call_after"] == (now + timedelta(hours=1)).isoformat()
+
+        detail = await session.get(CampaignDetail, retry_now)
+        assert detail is not None
+        assert len(detail.attempts) == 2
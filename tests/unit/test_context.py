@@ -1,4 +1,3 @@
-import json
 from datetime import timedelta
 from typing import cast
 from uuid import uuid4
@@ -10,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from echo.context.context import UserContext
 from echo.context.types import Channel, Chat
 from echo.store.store import PostgresStore
+from echo.utils import messages
 
 OPPORTUNITY_ID = "0063Y00001B8anuQAB"
 INIT_CHANNEL: Channel = "voice"
@@ -61,8 +61,113 @@ async def test_get_user_context_by_type(ctx: UserContext) -> None:
     async with ctx:
         res = await ctx.get_context(types=["blob"])
 
-    summary = json.loads(res[0].content)
-    assert summary["url"] == "a blob url"
+    assert res[0].content == {"url": "a blob url"}
+
+
+@pytest.mark.asyncio
+async def test_get_user_context_newest_first(ctx: UserContext) -> None:
+    latest: Chat = [{"role": "user", "content": "latest"}]
+    async with ctx:
+        await ctx.add_chat(latest)
+
+    async with ctx:
+        res = await ctx.get_context(types=["chat"], limit=1)
+
+    assert [context.content for context in res] == [latest]
+
+
+@pytest.mark.asyncio
+async def test_buffered_context_coalesces_chats(seed_user: None) -> None:
+    ctx = UserContext(opportunity_id=OPPORTUNITY_ID, channel="whatsapp", buffered=True, coalesce_chats=True)
+
+    async with ctx:
+        await ctx.add_chat([{"role": "user", "content": "hi"}])
+        await ctx.add_chat([{"role": "user", "content": "are you there?"}])
+        await ctx.add_blob({"url": "a blob url"})
+        await ctx.add_chat([{"role": "assistant", "content": "yes"}])
+        assert await ctx.store.context.get_context_history(thread_id=ctx.thread_id) == []
+
+    with pytest.raises(RuntimeError):
+        async with ctx:
+            await ctx.add_summary("discarded")
+            raise RuntimeError
+
+    async with ctx:
+        res = await ctx.store.context.get_context_history(thread_id=ctx.thread_id)
+
+    assert sorted((context.type, len(context.content)) for context in res) == [("blob", 1), ("chat", 1), ("chat", 2)]
+
+
+@pytest.mark.asyncio
+async def test_flushed_contexts_keep_insertion_order(sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    opportunity_id = str(uuid4())
+    async with sessionmaker() as session:
+        await PostgresStore(session).users.upsert_user(user_id=uuid4(), opportunity_id=opportunity_id)
+        await session.commit()
+
+    ctx = UserContext(opportunity_id=opportunity_id, channel="whatsapp", buffered=True)
+    chats: list[Chat] = [[{"role": "user", "content": str(i)}] for i in range(5)]
+
+    async with ctx:
+        for chat in chats:
+            await ctx.add_chat(chat)
+
+    async with ctx:
+        history = await ctx.store.context.get_context_history(thread_id=ctx.thread_id)
+        [latest] = await ctx.store.context.get_context_history(thread_id=ctx.thread_id, limit=1)
+
+    assert [context.content for context in history] == chats[::-1]
+    assert latest.content == chats[-1]
+
+
+@pytest.mark.asyncio
+async def test_update_summary_without_new_chats(sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    opportunity_id = str(uuid4())
+    async with sessionmaker() as session:
+        await PostgresStore(session).users.upsert_user(user_id=uuid4(), opportunity_id=opportunity_id)
+        await session.commit()
+
+    ctx = UserContext(opportunity_id=opportunity_id, channel="voice")
+    async with ctx:
+        assert await ctx.update_summary() is None
+        await ctx.add_summary("previous")
+
+    async with ctx:
+        assert await ctx.update_summary() == "previous"
+
+
+@pytest.mark.asyncio
+async def test_update_summary_folds_every_chat_once(
+    sessionmaker: async_sessionmaker[AsyncSession], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    opportunity_id = str(uuid4())
+    async with sessionmaker() as session:
+        await PostgresStore(session).users.upsert_user(user_id=uuid4(), opportunity_id=opportunity_id)
+        await session.commit()
+
+    calls: list[tuple[str | None, list[str]]] = []
+
+    async def aupdate_summary(previous: str | None, chat: Chat) -> str:
+        calls.append((previous, [message["content"] for message in chat]))
+        return f"summary {len(calls)}"
+
+    monkeypatch.setattr(messages, "aupdate_summary", aupdate_summary)
+
+    ctx = UserContext(opportunity_id=opportunity_id, channel="voice")
+    async with ctx:
+        await ctx.add_chat([{"role": "user", "content": "c1"}])
+
+    async with ctx:
+        await ctx.add_chat([{"role": "user", "content": "c2"}])
+        assert await ctx.update_summary() == "summary 1"
+        await ctx.add_chat([{"role": "user", "content": "c3"}])
+
+    async with ctx:
+        await ctx.add_chat([{"role": "user", "content": "c4"}])
+        assert await ctx.update_summary() == "summary 2"
+        assert await ctx.update_summary() == "summary 2"
+
+    assert calls == [(None, ["c1", "c2"]), ("summary 1", ["c3", "c4"])]
 
 
 # Utils
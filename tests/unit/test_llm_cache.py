@@ -0,0 +1,25 @@
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from echo.utils.cache import TieredCache
+from echo.utils.llm_cache import LLMCache, get_llm_cache
+
+
+@pytest.mark.asyncio
+async def test_llm_cache_serves_repeated_prompts() -> None:
+    cache = LLMCache(TieredCache("test:llm", ttl=60))
+    model = FakeListChatModel(responses=["first", "second", "third"], cache=cache)
+
+    assert (await model.ainvoke("resume esto")).content == "first"
+    assert (await model.ainvoke("resume esto")).content == "first"
+    assert (await model.ainvoke("otra cosa")).content == "second"
+    assert model.invoke("resume esto").content == "first"
+
+    assert (cache.hits, cache.misses) == (2, 2)
+    assert cache.hit_rate == 0.5
+
+
+def test_llm_cache_disabled_by_default(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("LLM_CACHE", raising=False)
+
+    assert get_llm_cache() is None
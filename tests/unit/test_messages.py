@@ -1,10 +1,20 @@
+import asyncio
 import json
 from pathlib import Path
 from typing import Any, cast
 
 import pytest
+from langchain_core.runnables import RunnableLambda
 
-from echo.utils.messages import livekit_report_to_chat
+from echo.context.types import Chat
+from echo.utils import messages
+from echo.utils.messages import (
+    build_summaries,
+    chunk_chat,
+    estimate_tokens,
+    livekit_report_to_chat,
+    livekit_report_to_messages,
+)
 
 
 @pytest.fixture
@@ -22,3 +32,53 @@ def test_report_to_chat(report: dict[str, Any]) -> None:
         assert "role" in message
         assert message["role"] in ["assistant", "user", "system"]
         assert len(message["content"]) > 0
+
+
+def test_report_to_messages_matches_chat(report: dict[str, Any]) -> None:
+    chat = livekit_report_to_chat(report)
+    messages = livekit_report_to_messages(report)
+
+    assert [(m.type, m.content) for m in messages] == [
+        ("human" if m["role"] == "user" else "ai", m["content"]) for m in chat
+    ]
+
+
+def test_chunk_chat_respects_budget(report: dict[str, Any]) -> None:
+    chat = livekit_report_to_chat(report)
+    budget = max(estimate_tokens(f"{m['role']}: {m['content']}\n") for m in chat)
+
+    chunks = chunk_chat(chat, budget)
+
+    assert len(chunks) > 1
+    assert [message for chunk in chunks for message in chunk] == chat
+    for chunk in chunks:
+        assert sum(estimate_tokens(f"{m['role']}: {m['content']}\n") for m in chunk) <= budget
+
+
+def test_chunk_chat_truncates_long_messages() -> None:
+    chat: Chat = [{"role": "user", "content": ""}, {"role": "user", "content": "a" * 1000}]
+
+    chunks = chunk_chat(chat, 10)
+
+    assert chunks == [[{"role": "user", "content": "a" * 40}]]
+
+
+@pytest.mark.asyncio
+async def test_build_summaries_bounds_concurrency(monkeypatch: pytest.MonkeyPatch) -> None:
+    running = peak = 0
+
+    async def summarize(input: dict[str, Chat]) -> str:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return input["chat"][0]["content"]
+
+    monkeypatch.setattr(messages, "build_chain", lambda: RunnableLambda(summarize))
+    chats: list[Chat] = [[{"role": "user", "content": str(i)}] for i in range(10)]
+
+    summaries = await build_summaries(chats, max_concurrency=3)
+
+    assert summaries == [str(i) for i in range(10)]
+    assert peak == 3
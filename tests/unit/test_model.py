@@ -0,0 +1,24 @@
+import asyncio
+
+import pytest
+
+from echo import config as cfg
+from echo.utils import model
+from echo.utils.model import ChatModel, build_model
+
+
+def test_build_model_once_per_event_loop(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(cfg, "LLM_PROVIDER", model.OPENAI)
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("OPENAI_MODEL", "gpt-test")
+
+    async def build() -> tuple[ChatModel, ChatModel]:
+        return build_model(), build_model()
+
+    first, again = asyncio.run(build())
+    second, _ = asyncio.run(build())
+
+    assert first is again
+    assert second is not first
+    # Each loop gets its own HTTP client instead of the one bound to the first loop.
+    assert second.root_async_client._client is not first.root_async_client._client
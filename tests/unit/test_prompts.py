@@ -0,0 +1,33 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import echo.config as cfg
+from echo.prompts import clear_prompt_cache, load_component_prompt, load_prompt_by_name
+
+
+@pytest.fixture(autouse=True)
+def _clear_prompt_cache() -> None:
+    clear_prompt_cache()
+
+
+def test_prompt_files_are_read_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(cfg, "PROMPTS_FOLDER", str(tmp_path))
+    prompt = tmp_path / "greeting.txt"
+    prompt.write_text("Hola")
+    assert load_prompt_by_name("greeting") == "Hola"
+
+    prompt.write_text("Buenas")
+    assert load_prompt_by_name("greeting") == "Hola"
+
+    clear_prompt_cache()
+    assert load_prompt_by_name("greeting") == "Buenas"
+
+
+def test_component_prompt_is_read_next_to_caller(tmp_path: Path) -> None:
+    (tmp_path / "prompt.txt").write_text("Componente")
+    namespace: dict[str, Any] = {"load_component_prompt": load_component_prompt}
+    exec(compile("result = load_component_prompt()", str(tmp_path / "component.py"), "exec"), namespace)
+
+    assert namespace["result"] == "Componente"
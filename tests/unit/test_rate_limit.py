@@ -0,0 +1,67 @@
+import fakeredis
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from echo.utils.rate_limit import LLMRateLimiter, RateLimits, get_rate_limiter
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_queues_over_budget_requests() -> None:
+    limiter = LLMRateLimiter(
+        "test", RateLimits(requests_per_minute=600, tokens_per_minute=6000), tokens_per_request=3000
+    )
+
+    assert await limiter.aacquire()
+    assert await limiter.aacquire()
+    # The token bucket is empty: a third call would wait ~30s for a refill.
+    assert not await limiter.aacquire(blocking=False)
+    assert not limiter.acquire(blocking=False)
+
+    limiter.record_usage(1000)
+    assert limiter.tokens_per_request == 2600
+
+    limiter.tokens_per_request = 1
+    assert await limiter.aacquire()
+    assert (limiter.acquired, limiter.throttled) == (3, 1)
+    assert limiter.wait_seconds == pytest.approx(0.01, abs=0.01)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_applies_to_models() -> None:
+    limiter = LLMRateLimiter("test", RateLimits(requests_per_minute=1))
+    model = FakeListChatModel(responses=["a", "b"], rate_limiter=limiter, callbacks=limiter.callbacks)
+
+    await model.ainvoke("hola")
+    assert not limiter.acquire(blocking=False)
+    assert limiter.acquired == 1
+
+
+def test_rate_limiter_disabled_by_default(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("LLM_REQUESTS_PER_MINUTE", raising=False)
+    monkeypatch.delenv("LLM_TOKENS_PER_MINUTE", raising=False)
+
+    assert get_rate_limiter("unconfigured") is None
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_shares_buckets_through_redis() -> None:
+    server = fakeredis.FakeServer()
+    limits = RateLimits(requests_per_minute=600, tokens_per_minute=6000)
+    # Two processes limiting the same deployment.
+    first, second = (
+        LLMRateLimiter("shared", limits, redis=fakeredis.FakeAsyncRedis(server=server), tokens_per_request=3000)
+        for _ in range(2)
+    )
+
+    assert await first.aacquire()
+    assert await second.aacquire()
+    assert not await first.aacquire(blocking=False)
+    assert not await second.aacquire(blocking=False)
+
+    first.tokens_per_request = 1
+    assert await first.aacquire()
+    assert (first.acquired, first.throttled) == (2, 1)
+    assert first.wait_seconds == pytest.approx(0.01, abs=0.01)
+
+    other = LLMRateLimiter("other", limits, redis=fakeredis.FakeAsyncRedis(server=server), tokens_per_request=3000)
+    assert await other.aacquire(blocking=False)
@@ -1,13 +1,16 @@
+import asyncio
 from collections.abc import AsyncIterator
-from datetime import timedelta
+from datetime import UTC, datetime, timedelta
 from uuid import uuid4
 
 import pytest
 import pytest_asyncio
 from dotenv import load_dotenv
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 import echo.events.v1 as events
+from echo.db.models.room import Room
 from echo.store.store import PostgresStore, Store
 
 load_dotenv()
@@ -108,3 +111,108 @@ async def test_room_start_end(store: PostgresStore) -> None:
     assert rows[-1].end_timestamp == end_event.timestamp
     assert rows[-1].report_url == end_event.report_url
     assert rows[-1].metadata_ == metadata_end
+
+
+@pytest.mark.asyncio
+async def test_rooms_keyset_pages(store: PostgresStore) -> None:
+    # Start after every room already in the shared database, so the pages only hold this run's rooms.
+    latest = await store.session.scalar(select(func.max(Room.start_timestamp)))
+    base = max(datetime.now(UTC) + timedelta(days=365), (latest or datetime.now(UTC)) + timedelta(minutes=1))
+    room_ids = [str(uuid4()) for _ in range(3)]
+
+    for i, room_id in enumerate(room_ids):
+        await store.rooms.set_room_start(
+            room_id=room_id,
+            thread_id=uuid4(),
+            opportunity_id=str(uuid4()),
+            start_timestamp=base + timedelta(minutes=i),
+        )
+    await store.session.commit()
+
+    first = await store.rooms.get_rooms_page(limit=2)
+    assert [r.room_id for r in first] == [room_ids[2], room_ids[1]]
+
+    last = first[-1]
+    assert last.start_timestamp is not None
+    second = await store.rooms.get_rooms_page(limit=2, after=(last.start_timestamp, last.room_id))
+    assert second[0].room_id == room_ids[0]
+
+    streamed = [room.room_id async for room in store.rooms.stream_rooms(batch_size=2)]
+    assert set(room_ids) <= set(streamed)
+
+    summaries = await store.rooms.get_room_summaries(limit=2)
+    assert [s.room_id for s in summaries] == [r.room_id for r in first]
+
+
+@pytest.mark.asyncio
+async def test_append_timeline_concurrently(sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    room_id = str(uuid4())
+
+    async with sessionmaker() as session:
+        await PostgresStore(session).rooms.set_room_start(room_id, uuid4(), str(uuid4()), datetime.now(UTC))
+        await session.commit()
+
+    async def append(i: int) -> bool:
+        async with sessionmaker() as session:
+            appended = await PostgresStore(session).rooms.append_timeline(room_id, {"event": i})
+            await session.commit()
+            return appended
+
+    assert all(await asyncio.gather(*(append(i) for i in range(10))))
+
+    async with sessionmaker() as session:
+        store = PostgresStore(session)
+        room = await store.rooms.get_room(room_id)
+        assert room is not None
+        assert sorted(entry["event"] for entry in room.timeline) == list(range(10))
+        assert not await store.rooms.append_timeline(str(uuid4()), {"event": 0})
+
+
+@pytest.mark.asyncio
+async def test_update_metadata(store: PostgresStore) -> None:
+    room_a, room_b = str(uuid4()), str(uuid4())
+    for room_id in (room_a, room_b):
+        await store.rooms.set_room_start(room_id, uuid4(), str(uuid4()), datetime.now(UTC), metadata={"keep": 1})
+    await store.session.commit()
+
+    assert await store.rooms.update_metadata(room_a, {"status": "done", "ignored": None})
+    assert not await store.rooms.update_metadata(room_a, {"ignored": ""})
+    assert not await store.rooms.update_metadata(str(uuid4()), {"status": "done"})
+
+    updated = await store.rooms.update_metadata_many(
+        {room_a: {"status": "final"}, room_b: {"extra": True}, str(uuid4()): {"extra": True}}
+    )
+    await store.session.commit()
+
+    assert updated == 2
+    room = await store.rooms.get_room(room_a)
+    assert room is not None
+    await store.session.refresh(room)
+    assert room.metadata_ == {"keep": 1, "status": "final"}
+    room = await store.rooms.get_room(room_b)
+    assert room is not None
+    await store.session.refresh(room)
+    assert room.metadata_ == {"keep": 1, "extra": True}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("prepared", [False, True])
+async def test_room_upsert_keeps_unset_fields(store: PostgresStore, prepared: bool) -> None:
+    room_id = str(uuid4())
+    thread_id = uuid4()
+    opportunity_id = str(uuid4())
+    start = datetime.now(UTC)
+    end = start + timedelta(minutes=3)
+
+    await store.rooms.set_room_start(
+        room_id, thread_id, opportunity_id, start, metadata={"lang": "es"}, prepared=prepared
+    )
+    await store.rooms.set_room_end(room_id, thread_id, opportunity_id, end, prepared=prepared)
+    await store.session.commit()
+
+    room = await store.rooms.get_room(room_id)
+    assert room is not None
+    assert room.start_timestamp == start
+    assert room.end_timestamp == end
+    assert room.metadata_ == {"lang": "es"}
+    assert room.timeline == []
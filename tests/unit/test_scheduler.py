@@ -0,0 +1,151 @@
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from uuid import uuid4
+
+import pytest
+from aio_pika.abc import AbstractIncomingMessage, TimeoutType
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+import echo.events.v1 as events
+from echo.db.models.scheduled_call import ScheduledCall
+from echo.store.store import PostgresStore
+from echo.utils.scheduler import dispatch_due_calls, dispatch_due_events
+
+
+class FakeQueue:
+    def __init__(self, fail: set[str] | None = None) -> None:
+        self.sent: list[events.BaseEvent] = []
+        self.fail = fail or set()
+
+    async def start(self, callback: Callable[[Any], Awaitable[Any]]) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def get(self, *, no_ack: bool = False, timeout: TimeoutType = 5) -> AbstractIncomingMessage | None:
+        return None
+
+    async def purge(self) -> bool:
+        self.sent.clear()
+        return True
+
+    async def send_event(self, event: events.BaseEvent, delay_ms: int | None = None) -> None:
+        if isinstance(event, events.SessionEvent) and event.opportunity_id in self.fail:
+            raise ConnectionError("queue unavailable")
+        self.sent.append(event)
+
+
+def build_event(call: ScheduledCall) -> events.BaseEvent:
+    return events.CreateWhatsappSummary(opportunity_id=call.opportunity_id)
+
+
+@pytest.mark.asyncio
+async def test_claim_due_calls_is_exclusive(sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    now = datetime.now(UTC)
+    due = {str(uuid4()) for _ in range(4)}
+    later = str(uuid4())
+
+    async with sessionmaker() as session:
+        store = PostgresStore(session)
+        for opportunity_id in due:
+            await store.schedule_calls.upsert_schedule_call(opportunity_id, now - timedelta(minutes=1), None)
+        await store.schedule_calls.upsert_schedule_call(later, now + timedelta(hours=1), None)
+        await session.commit()
+
+    async with sessionmaker() as first, sessionmaker() as second:
+        claimed_first = await PostgresStore(first).schedule_calls.claim_due(2)
+        claimed_second = await PostgresStore(second).schedule_calls.claim_due(10)
+        await first.commit()
+        await second.commit()
+
+    first_ids = {call.opportunity_id for call in claimed_first}
+    second_ids = {call.opportunity_id for call in claimed_second}
+    assert len(first_ids) == 2
+    assert first_ids.isdisjoint(second_ids)
+    assert due <= first_ids | second_ids
+    assert later not in second_ids
+    assert all(call.status == "dispatching" for call in claimed_first)
+
+    async with sessionmaker() as session:
+        store = PostgresStore(session)
+        assert not due & {call.opportunity_id for call in await store.schedule_calls.claim_due(10)}
+        recovered = await store.schedule_calls.claim_due(10, visibility_timeout=timedelta(0))
+        assert due <= {call.opportunity_id for call in recovered}
+        assert await store.schedule_calls.release(recovered) == len(recovered)
+        await session.commit()
+
+    failing = next(iter(due))
+    queue = FakeQueue(fail={failing})
+    assert await dispatch_due_calls(queue, build_event) >= len(due) - 1
+
+    async with sessionmaker() as session:
+        statuses = {
+            call.opportunity_id: call.status for call in await PostgresStore(session).schedule_calls.get_ready_calls()
+        }
+        assert statuses.get(failing) == "pending"
+        assert not (due - {failing}) & statuses.keys()
+
+
+@pytest.mark.asyncio
+async def test_dispatch_due_events(sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    opportunity_id = str(uuid4())
+
+    async with sessionmaker() as session:
+        store = PostgresStore(session)
+        await store.scheduled_events.schedule(
+            events.CreateWhatsappSummary(opportunity_id=opportunity_id),
+            datetime.now(UTC) - timedelta(seconds=1),
+        )
+        await store.scheduled_events.schedule(
+            events.CreateWhatsappSummary(opportunity_id=str(uuid4())),
+            datetime.now(UTC) + timedelta(hours=1),
+        )
+        await session.commit()
+
+    queue = FakeQueue()
+    assert await dispatch_due_events(queue) == 1
+    assert [getattr(event, "opportunity_id", None) for event in queue.sent] == [opportunity_id]
+    assert await dispatch_due_events(queue) == 0
+
+    async with sessionmaker() as session:
+        assert await PostgresStore(session).scheduled_events.claim_due(visibility_timeout=timedelta(0)) == []
+
+
+@pytest.mark.asyncio
+async def test_settling_a_lost_claim_is_a_no_op(sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    opportunity_id = str(uuid4())
+
+    async with sessionmaker() as session:
+        await PostgresStore(session).schedule_calls.upsert_schedule_call(
+            opportunity_id, datetime.now(UTC) - timedelta(minutes=1), None
+        )
+        await session.commit()
+
+    async with sessionmaker() as session:
+        [stale] = [
+            call
+            for call in await PostgresStore(session).schedule_calls.claim_due(1000)
+            if call.opportunity_id == opportunity_id
+        ]
+        await session.commit()
+
+    # A second dispatcher takes the call over once the first one looks dead.
+    async with sessionmaker() as session:
+        [current] = [
+            call
+            for call in await PostgresStore(session).schedule_calls.claim_due(1000, visibility_timeout=timedelta(0))
+            if call.opportunity_id == opportunity_id
+        ]
+        await session.commit()
+
+    async with sessionmaker() as session:
+        store = PostgresStore(session)
+        assert await store.schedule_calls.release([stale]) == 0
+        assert await store.schedule_calls.mark_finished_many([stale]) == 0
+        assert await store.schedule_calls.mark_finished_many([current]) == 1
+        # Rescheduled calls are back to `pending` and no longer claimed by anyone.
+        await store.schedule_calls.upsert_schedule_call(opportunity_id, datetime.now(UTC), None)
+        assert await store.schedule_calls.mark_finished_many([current]) == 0
+        await session.commit()
@@ -0,0 +1,50 @@
+import pytest
+from aiohttp import web
+
+from echo.storage.azure import AzureStorage
+
+
+@pytest.mark.asyncio
+async def test_sas_downloads_share_connections(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("AZURE_ACCOUNT_NAME", "echo")
+    monkeypatch.setenv("AZURE_STORAGE_CONTAINER_SESSIONS_NAME", "sessions")
+    monkeypatch.setenv(
+        "AZURE_STORAGE_CONNECTION_STRING",
+        "DefaultEndpointsProtocol=https;AccountName=echo;AccountKey=ZWNobw==;EndpointSuffix=core.windows.net",
+    )
+
+    body = b'{"room": "r"}'
+    peers: list[object] = []
+
+    async def download(request: web.Request) -> web.Response:
+        assert request.transport is not None
+        peers.append(request.transport.get_extra_info("peername"))
+        return web.Response(
+            status=206,
+            body=body,
+            headers={
+                "Content-Range": f"bytes 0-{len(body) - 1}/{len(body)}",
+                "ETag": '"etag"',
+                "x-ms-blob-type": "BlockBlob",
+            },
+        )
+
+    app = web.Application()
+    app.router.add_get("/{path:.*}", download)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    port = runner.addresses[0][1]
+
+    storage = AzureStorage()
+    try:
+        for room_id in ("r1", "r2"):
+            url = f"http://127.0.0.1:{port}/echo/sessions/recordings/{room_id}/session-report.json?sv=2024&sig=x"
+            assert await storage.get_blob_content(url, sas=True) == body
+    finally:
+        await storage.url_transport.close()
+        await runner.cleanup()
+
+    # Both downloads went over the same pooled connection.
+    assert len(peers) == 2
+    assert peers[0] == peers[1]
@@ -0,0 +1,118 @@
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import HistogramDataPoint, InMemoryMetricReader, NumberDataPoint
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from echo.db.agents import session as agents_session
+from echo.db.base import (
+    PoolConfig,
+    RoutingSession,
+    create_engine,
+    create_sessionmaker,
+    dispose_engine,
+    get_engine,
+)
+from echo.db.models.room import Room
+from echo.store.store import PostgresStore
+from echo.utils.monitoring import instrument_engine
+
+
+@pytest.mark.asyncio
+async def test_routing_session_pins_primary_after_write(engine: AsyncEngine) -> None:
+    replica = create_engine()
+    sessionmaker = create_sessionmaker(engine, replica=replica)
+
+    try:
+        async with sessionmaker() as session:
+            routing = session.sync_session
+            assert isinstance(routing, RoutingSession)
+            read = select(Room).execution_options(replica=True)
+            assert routing.get_bind(clause=read) is replica.sync_engine
+            assert routing.get_bind(clause=select(Room)) is engine.sync_engine
+            assert routing.pinned
+            assert routing.get_bind(clause=read) is engine.sync_engine
+
+        async with sessionmaker() as session:
+            routing = session.sync_session
+            assert isinstance(routing, RoutingSession)
+            assert routing.get_bind(clause=update(Room).values(report_url="x")) is engine.sync_engine
+            assert routing.pinned
+
+        async with sessionmaker() as session:
+            routing = session.sync_session
+            assert isinstance(routing, RoutingSession)
+            assert routing.get_bind(clause=select(Room).with_for_update()) is engine.sync_engine
+
+        async with sessionmaker() as session:
+            routing = session.sync_session
+            assert isinstance(routing, RoutingSession)
+            store = PostgresStore(session)
+            room_id = str(uuid4())
+            assert await store.rooms.get_room(room_id) is None
+            assert not routing.pinned
+
+            await store.rooms.set_room_start(room_id, uuid4(), str(uuid4()), datetime.now(UTC))
+            assert routing.pinned
+            assert await store.rooms.get_room(room_id) is not None
+            await session.rollback()
+            assert not routing.pinned
+    finally:
+        await replica.dispose()
+
+
+def test_pool_config_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("POSTGRES_POOL_SIZE", "3")
+    monkeypatch.setenv("POSTGRES_POOL_PRE_PING", "false")
+    monkeypatch.setenv("POSTGRES_POOL_RECYCLE", "300")
+
+    config = PoolConfig.from_env()
+
+    assert config == PoolConfig(size=3, pre_ping=False, recycle=300)
+
+
+@pytest.mark.asyncio
+async def test_instrument_engine_reports_pool_metrics() -> None:
+    reader = InMemoryMetricReader()
+    meter = MeterProvider(metric_readers=[reader]).get_meter("test")
+    engine = create_engine(pool=PoolConfig(size=1, max_overflow=0))
+    instrument_engine(engine, name="test", meter=meter)
+
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+            data = reader.get_metrics_data()
+            assert data is not None
+            points = {
+                metric.name: list(metric.data.data_points)
+                for resource in data.resource_metrics
+                for scope in resource.scope_metrics
+                for metric in scope.metrics
+            }
+            [checked_out] = points["db.pool.connections.checked_out"]
+            [wait_time] = points["db.pool.checkout.wait_time"]
+            assert isinstance(checked_out, NumberDataPoint)
+            assert isinstance(wait_time, HistogramDataPoint)
+            assert checked_out.value == 1
+            assert wait_time.count == 1
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_agents_shared_engine_sets_search_path(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("POSTGRES_SHARE_ENGINE", "true")
+    await agents_session.dispose_engine()
+
+    try:
+        async with agents_session.get_sessionmaker()() as session:
+            assert session.bind is get_engine()
+            search_path = await session.scalar(text("SHOW search_path"))
+            assert search_path == "agents, public"
+    finally:
+        await agents_session.dispose_engine()
+        await dispose_engine()
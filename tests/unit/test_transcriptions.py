@@ -0,0 +1,184 @@
+import json
+import tarfile
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from echo.db.models.insight import CallRecord
+from echo.utils import transcriptions
+from echo.utils.transcriptions import export_campaign_transcriptions
+
+
+class FakeStorage:
+    def __init__(self) -> None:
+        self.fetched: list[str] = []
+
+    async def fetch_report(self, room_id: str) -> dict[str, Any]:
+        self.fetched.append(room_id)
+        return {
+            "events": [
+                {"type": "user_input_transcribed", "is_final": True, "transcript": f"hello {room_id}"},
+                {
+                    "type": "conversation_item_added",
+                    "item": {"type": "message", "role": "assistant", "content": ["hi", "there"]},
+                },
+            ]
+        }
+
+
+@pytest.mark.asyncio
+async def test_export_latest_record_per_opportunity(
+    sessionmaker: async_sessionmaker[AsyncSession],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    campaign_id = str(uuid4())
+    now = datetime.now(UTC)
+
+    async with sessionmaker() as session:
+        for opportunity_id in ("opp-1", "opp-2"):
+            session.add_all(
+                [
+                    CallRecord(
+                        campaign_id=campaign_id,
+                        opportunity_id=opportunity_id,
+                        room_id=f"{opportunity_id}-old",
+                        processed_at=now - timedelta(days=1),
+                    ),
+                    CallRecord(
+                        campaign_id=campaign_id,
+                        opportunity_id=opportunity_id,
+                        room_id=f"{opportunity_id}-new",
+                        score="A",
+                        processed_at=now,
+                    ),
+                ]
+            )
+        await session.commit()
+
+    storage = FakeStorage()
+
+    async def get_storage() -> FakeStorage:
+        return storage
+
+    monkeypatch.setattr(transcriptions, "get_storage", get_storage)
+
+    output = tmp_path / "out.jsonl"
+    checkpoint = tmp_path / "out.checkpoint"
+
+    stats = await export_campaign_transcriptions(
+        campaign_id,
+        output,
+        output_format="jsonl",
+        concurrency=2,
+        checkpoint=checkpoint,
+    )
+
+    assert stats.exported == 2
+    assert sorted(storage.fetched) == ["opp-1-new", "opp-2-new"]
+
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert {line["room_id"] for line in lines} == {"opp-1-new", "opp-2-new"}
+    assert lines[0]["transcription"].endswith("Agent: hi there")
+
+    resumed = await export_campaign_transcriptions(
+        campaign_id,
+        output,
+        output_format="jsonl",
+        checkpoint=checkpoint,
+    )
+
+    assert resumed.exported == 0
+    assert resumed.cached == 2
+    assert len(output.read_text().splitlines()) == 2
+
+
+@pytest.mark.parametrize("output_format", ["tar", "jsonl"])
+def test_resume_drops_partially_written_entry(tmp_path: Path, output_format: transcriptions.ExportFormat) -> None:
+    def transcription(opportunity_id: str) -> transcriptions._Transcription:
+        return transcriptions._Transcription(
+            opportunity_id=opportunity_id, room_id="room", score="A", processed_at=None, text=opportunity_id * 600
+        )
+
+    output = tmp_path / f"out.{output_format}"
+    writer = transcriptions._TranscriptionWriter(output, output_format, append=False)
+    writer.write(transcription("opp-1"))
+    writer.flush()
+    size = output.stat().st_size
+    writer.write(transcription("opp-2"))
+    writer.close()
+    # Simulate a crash in the middle of the second entry.
+    with open(output, "r+b") as f:
+        f.truncate(size + 700)
+
+    writer = transcriptions._TranscriptionWriter(output, output_format, append=True)
+    writer.write(transcription("opp-3"))
+    writer.close()
+
+    if output_format == "tar":
+        with tarfile.open(output) as tar:
+            contents = [tar.extractfile(member).read().decode() for member in tar]  # type: ignore[union-attr]
+    else:
+        contents = [json.loads(line)["transcription"] for line in output.read_text().splitlines()]
+    assert contents == ["opp-1" * 600, "opp-3" * 600]
+
+
+@pytest.mark.asyncio
+async def test_export_syncs_output_once_per_checkpoint_batch(
+    sessionmaker: async_sessionmaker[AsyncSession],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    campaign_id = str(uuid4())
+    now = datetime.now(UTC)
+    opportunity_ids = [f"opp-{i}" for i in range(5)]
+
+    async with sessionmaker() as session:
+        session.add_all(
+            CallRecord(
+                campaign_id=campaign_id,
+                opportunity_id=opportunity_id,
+                room_id=f"{opportunity_id}-room",
+                score="B",
+                processed_at=now,
+            )
+            for opportunity_id in opportunity_ids
+        )
+        await session.commit()
+
+    storage = FakeStorage()
+
+    async def get_storage() -> FakeStorage:
+        return storage
+
+    monkeypatch.setattr(transcriptions, "get_storage", get_storage)
+
+    flush = transcriptions._TranscriptionWriter.flush
+    flushed: list[int] = []
+
+    def counting_flush(writer: transcriptions._TranscriptionWriter) -> None:
+        flushed.append(len(writer._unsynced))
+        flush(writer)
+
+    monkeypatch.setattr(transcriptions._TranscriptionWriter, "flush", counting_flush)
+
+    output = tmp_path / "out"
+    checkpoint = tmp_path / "out.checkpoint"
+    # Left over from an export that stopped before checkpointing this entry.
+    stale = output / transcriptions.get_transcription_path(now, "B", "opp-0")
+    stale.parent.mkdir(parents=True)
+    stale.write_text("trunc")
+
+    stats = await export_campaign_transcriptions(
+        campaign_id, output, output_format="files", checkpoint=checkpoint, checkpoint_every=2
+    )
+
+    assert stats.exported == 5
+    assert flushed == [2, 2, 1]
+    assert sorted(checkpoint.read_text().splitlines()) == opportunity_ids
+    assert "hello opp-0-room" in stale.read_text()
+    assert not list(output.rglob("*.partial"))
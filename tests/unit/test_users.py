@@ -0,0 +1,110 @@
+from collections.abc import AsyncIterator
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from echo.db.models.user import User
+from echo.store.store import PostgresStore
+from echo.store.users import get_user_cache
+
+
+@pytest_asyncio.fixture
+async def store(sessionmaker: async_sessionmaker[AsyncSession]) -> AsyncIterator[PostgresStore]:
+    async with sessionmaker() as session:
+        yield PostgresStore(session)
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_users(store: PostgresStore) -> None:
+    existing_id = uuid4()
+    opp_existing = str(uuid4())
+    opp_new = str(uuid4())
+
+    await store.users.upsert_user(user_id=existing_id, opportunity_id=opp_existing, name="Old")
+    await store.session.commit()
+
+    count = await store.users.bulk_upsert_users(
+        [
+            {"opportunity_id": opp_existing, "name": "Updated", "market": "es"},
+            {"opportunity_id": opp_new, "name": "First"},
+            {"opportunity_id": opp_new, "name": "Second", "mail": "a@b.com"},
+            {"opportunity_id": None, "name": "Ignored"},
+        ]
+    )
+    await store.session.commit()
+
+    assert count == 2
+
+    existing = await store.users.get_user(opportunity_id=opp_existing)
+    assert existing is not None
+    await store.session.refresh(existing)
+    assert existing.user_id == existing_id
+    assert existing.name == "Updated"
+    assert existing.market == "es"
+
+    new = await store.users.get_user(opportunity_id=opp_new)
+    assert new is not None
+    assert new.user_id is not None
+    assert new.name == "Second"
+    assert new.mail == "a@b.com"
+
+
+@pytest.mark.asyncio
+async def test_user_cache(sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    opp_a, opp_b = str(uuid4()), str(uuid4())
+    async with sessionmaker() as session:
+        store = PostgresStore(session)
+        await store.users.upsert_user(user_id=uuid4(), opportunity_id=opp_a, name="A")
+        await store.users.upsert_user(user_id=uuid4(), opportunity_id=opp_b, name="B")
+        await session.commit()
+
+        users = await store.users.get_users_by_opportunity_ids([opp_a, opp_b, str(uuid4())])
+        assert {opp: user.name for opp, user in users.items()} == {opp_a: "A", opp_b: "B"}
+
+        # Bypass the store so the cache is not invalidated.
+        await session.execute(update(User).where(User.opportunity_id == opp_a).values(name="stale"))
+        await session.commit()
+
+    async with sessionmaker() as session:
+        store = PostgresStore(session)
+        cached = await store.users.get_user_cached(opp_a)
+        assert cached is not None
+        assert cached.name == "A"
+        assert cached in session
+
+        await store.users.soft_delete_user(cached.user_id)
+        await session.commit()
+
+    async with sessionmaker() as session:
+        user = await PostgresStore(session).users.get_user_cached(opp_a)
+        assert user is not None
+        assert (user.name, user.is_active) == ("stale", False)
+
+
+@pytest.mark.asyncio
+async def test_user_cache_invalidated_on_commit(sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    opportunity_id = str(uuid4())
+    async with sessionmaker() as session:
+        store = PostgresStore(session)
+        await store.users.upsert_user(user_id=uuid4(), opportunity_id=opportunity_id, name="A")
+        await session.commit()
+        await store.users.get_user_cached(opportunity_id)
+
+    cache = get_user_cache()
+    async with sessionmaker() as session:
+        store = PostgresStore(session)
+        await store.users.upsert_user(user_id=uuid4(), opportunity_id=opportunity_id, name="B")
+        assert cache.memory.get(opportunity_id) is not None
+        await session.rollback()
+        assert cache.memory.get(opportunity_id) is not None
+
+        await store.users.upsert_user(user_id=uuid4(), opportunity_id=opportunity_id, name="B")
+        await session.commit()
+        assert cache.memory.get(opportunity_id) is None
+
+        user = await store.users.get_user_cached(opportunity_id)
+        assert user is not None
+        assert user.name == "B"